@@ -0,0 +1,90 @@
+"""
+AnalysisCache — SQLite cache of Claude analyses, keyed by a hash of the prompt, model and max_tokens.
+
+An unchanged prompt means unchanged data, so its analysis can be served without calling the API.
+The least recently used entries are evicted once the cache grows past its size limit.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+def cache_key(prompt: str, model: str, max_tokens: int) -> str:
+    digest = hashlib.sha256()
+    for part in (model, str(max_tokens), prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+CREATE TABLE IF NOT EXISTS analyses (
+    key        TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    response   TEXT NOT NULL,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+)""")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """Return (response, created_at) for key, or None on a miss."""
+        with self._lock, self._db:
+            row = self._db.execute("SELECT response, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE analyses SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0], row[1]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses (key, model, response, size, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, len(response.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the total size fits. Caller holds the lock."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM analyses").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        for key, size in self._db.execute("SELECT key, size FROM analyses ORDER BY last_used").fetchall():
+            if total <= self._max_bytes:
+                break
+            self._db.execute("DELETE FROM analyses WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Hits, misses and evictions of this run, with the current number and size of entries."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analyses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
@@ -6,19 +6,50 @@ Analyzer — builds the Claude prompt from collected data and calls the Claude A
 import os
 from tabulate import tabulate
 
+# Sections of the prompt that share the token budget, most important first. The opportunity,
+# products, trials, case and issue headers and the instructions are always included.
+DEFAULT_SECTION_PRIORITY = ["emails", "jira_comments", "case_comments", "jira_descriptions", "gong_summaries", "transcripts"]
+
+# A cut-down item shorter than this is dropped rather than included
+MIN_PARTIAL_CHARS = 200
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of text, about four characters per token."""
+    return (len(text) + 3) // 4
+
 
 class Analyzer:
-    def __init__(self, config: dict):
-        api_key = os.environ.get("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise RuntimeError(
-                "ANTHROPIC_API_KEY is not set. "
-                "Add 'export ANTHROPIC_API_KEY=<your-key>' to ~/.zshrc or ~/.bashrc and restart your shell."
-            )
-        import anthropic
-        self._client = anthropic.Anthropic(api_key=api_key)
+    def __init__(self, config: dict, client=None):
+        """client replaces the Anthropic client, e.g. with a local stub; it needs messages.create().
+
+        The analysis cache is only used with the real client, so stub output never answers for the model.
+        """
+        use_cache = client is None
+        if client is None:
+            api_key = os.environ.get("ANTHROPIC_API_KEY")
+            if not api_key:
+                raise RuntimeError(
+                    "ANTHROPIC_API_KEY is not set. "
+                    "Add 'export ANTHROPIC_API_KEY=<your-key>' to ~/.zshrc or ~/.bashrc and restart your shell."
+                )
+            import anthropic
+            client = anthropic.Anthropic(api_key=api_key)
+        self._client = client
         self._model = config.get("claude_model", "claude-sonnet-4-6")
+        self._max_tokens = 4096
         self._config = config
+        # Per-section counts of what the last build_prompt included, cut down and dropped
+        self.last_prompt_report: dict = {}
+
+        self.cache = None
+        cache_path = config.get("analysis_cache")
+        if cache_path and use_cache:
+            from analysis_cache import AnalysisCache
+            if not os.path.isabs(cache_path):
+                cache_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), cache_path)
+            max_mb = float(config.get("analysis_cache_max_mb", 50))
+            self.cache = AnalysisCache(cache_path, max_bytes=int(max_mb * 1024 * 1024))
 
     # ------------------------------------------------------------------
     # Truncation helper
@@ -43,15 +74,102 @@ class Analyzer:
         with open(path, "r") as f:
             return f.read()
 
+    # ------------------------------------------------------------------
+    # Token budget
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _item(section: str, recency, prefix: str, body, cap: int) -> dict:
+        """A budgeted prompt line: prefix plus body, capped at cap chars and cut further to fit the budget."""
+        return {"section": section, "recency": str(recency or ""), "prefix": prefix, "body": body, "cap": cap,
+                "text": None}
+
+    def _section_priority(self) -> list[str]:
+        configured = [s for s in self._config.get("prompt_section_priority", []) if s in DEFAULT_SECTION_PRIORITY]
+        return configured + [s for s in DEFAULT_SECTION_PRIORITY if s not in configured]
+
+    def _fit_budget(self, items: list[dict], budget: int) -> dict:
+        """Choose the text of each item: sections in priority order, the most recent items first.
+
+        Items that don't fit whole are cut down to the remaining budget, or dropped when too little is left.
+        Returns {section: counts} of the items included, cut down and dropped.
+        """
+        report = {section: {"items": 0, "included": 0, "truncated": 0, "dropped": 0, "tokens": 0,
+                            "dropped_tokens": 0}
+                  for section in self._section_priority()}
+        by_section: dict[str, list] = {}
+        for item in items:
+            by_section.setdefault(item["section"], []).append(item)
+
+        for section in report:
+            counts = report[section]
+            for item in sorted(by_section.get(section, []), key=lambda i: i["recency"], reverse=True):
+                full = item["prefix"] + self._trunc(item["body"], item["cap"])
+                cost = estimate_tokens(full) + 1
+                counts["items"] += 1
+                if budget is None or cost <= budget:
+                    item["text"] = full
+                    counts["included"] += 1
+                else:
+                    body = self._trunc(item["body"], item["cap"])
+                    room = budget * 4 - len(item["prefix"]) - 40
+                    if budget > 0 and room >= MIN_PARTIAL_CHARS and room < len(body):
+                        item["text"] = item["prefix"] + self._trunc(body, room)
+                        counts["truncated"] += 1
+                    else:
+                        counts["dropped"] += 1
+                    counts["dropped_tokens"] += cost - (estimate_tokens(item["text"]) + 1 if item["text"] else 0)
+                if item["text"] is not None:
+                    used = estimate_tokens(item["text"]) + 1
+                    counts["tokens"] += used
+                    if budget is not None:
+                        budget -= used
+        return report
+
+    @staticmethod
+    def _render(lines: list) -> list[str]:
+        """Flatten lines into text: items render their chosen text, blocks their header and items."""
+        out = []
+        for line in lines:
+            if isinstance(line, str):
+                out.append(line)
+            elif "items" in line:
+                shown = [item["text"] for item in line["items"] if item["text"] is not None]
+                if shown:
+                    out.append(line["header"])
+                    out.extend(shown)
+            elif line["text"] is not None:
+                out.append(line["text"])
+        return out
+
+    @staticmethod
+    def _omitted_note(report: dict) -> str:
+        parts = [f"{c['dropped'] + c['truncated']} of {c['items']} {section.replace('_', ' ')}"
+                 for section, c in report.items() if c["dropped"] or c["truncated"]]
+        if not parts:
+            return ""
+        return "NOTE: To fit the prompt budget, these were shortened or left out: " + ", ".join(parts) + ".\n"
+
     # ------------------------------------------------------------------
     # Prompt builder
     # ------------------------------------------------------------------
 
     def build_prompt(self, data: dict) -> str:
+        """Build the prompt, fitting emails, comments, Jira details and Gong calls into prompt_token_budget.
+
+        With no budget (0) every item is included up to its own character cap.
+        """
         cfg = self._config
         opp = data["opp"]
         opp_type = data.get("opp_type", "Closed Lost")
-        lines = []
+        # Strings are always included; items and blocks of items share the token budget
+        lines: list = []
+        items: list[dict] = []
+
+        def item(section, recency, prefix, body, cap):
+            entry = self._item(section, recency, prefix, body, cap)
+            items.append(entry)
+            return entry
 
         template = self._load_instructions_template()
         marker = "\n=== ANALYSIS INSTRUCTIONS ==="
@@ -121,24 +239,28 @@ class Analyzer:
 
                 case_emails = emails_by_case.get(cid, [])[:max_ep]
                 if case_emails:
-                    lines.append("    Emails:")
+                    block = {"header": "    Emails:", "items": []}
                     for em in case_emails:
                         direction = "IN" if em.get("Incoming") else "OUT"
                         md = em.get("MessageDate", "")
                         md_str = md.date().isoformat() if hasattr(md, "date") else str(md)[:10]
-                        lines.append(
-                            f"      [{md_str}] {direction} from {em.get('FromName', '')} | "
-                            f"{em.get('Subject', '')} | {self._trunc(em.get('TextBody'), 1000)}"
-                        )
+                        block["items"].append(item(
+                            "emails", md,
+                            f"      [{md_str}] {direction} from {em.get('FromName', '')} | {em.get('Subject', '')} | ",
+                            em.get("TextBody"), 1000,
+                        ))
+                    lines.append(block)
 
                 case_comments = comments_by_case.get(cid, [])[:max_cp]
                 if case_comments:
-                    lines.append("    Comments:")
+                    block = {"header": "    Comments:", "items": []}
                     for cc in case_comments:
                         vis = "Public" if cc.get("IsPublished") else "Internal"
-                        lines.append(
-                            f"      [{cc.get('CreatedDate', '')}] {vis} | {self._trunc(cc.get('CommentBody'), 500)}"
-                        )
+                        block["items"].append(item(
+                            "case_comments", cc.get("CreatedDate"),
+                            f"      [{cc.get('CreatedDate', '')}] {vis} | ", cc.get("CommentBody"), 500,
+                        ))
+                    lines.append(block)
         else:
             lines.append("No cases found.")
         lines.append("")
@@ -153,6 +275,18 @@ class Analyzer:
             key = jc.get("IssueKey") or jc.get("issuekey") or ""
             jira_comments_by_key.setdefault(key, []).append(jc)
 
+        # Apply the global max across all issues once, in issue order
+        shown_by_key: dict[str, list] = {}
+        remaining = max_jc
+        for issue in jira_issues:
+            if remaining <= 0:
+                break
+            key = issue.get("Key", "")
+            if key in shown_by_key:
+                continue
+            shown_by_key[key] = jira_comments_by_key.get(key, [])[:remaining]
+            remaining -= len(shown_by_key[key])
+
         if jira_issues:
             for issue in jira_issues:
                 key = issue.get("Key", "")
@@ -162,9 +296,9 @@ class Analyzer:
                 resolution = issue.get("ResolutionName")
                 if resolution:
                     lines.append(f"    Resolution: {resolution} on {issue.get('ResolutionDate', '')}")
-                desc = self._trunc(issue.get("Description"), 1500)
-                if desc:
-                    lines.append(f"    Description: {desc}")
+                if self._trunc(issue.get("Description"), 1500):
+                    lines.append(item("jira_descriptions", issue.get("Updated"), "    Description: ",
+                                      issue.get("Description"), 1500))
                 components = issue.get("ComponentsAggregate")
                 if components:
                     lines.append(f"    Components: {components}")
@@ -172,27 +306,15 @@ class Analyzer:
                 if fix_versions:
                     lines.append(f"    Fix Versions: {fix_versions}")
 
-                issue_comments = jira_comments_by_key.get(key, [])
-                all_jira_comments_count = sum(len(v) for v in jira_comments_by_key.values())
-                # Apply global max across all issues
-                shown_jira = []
-                total_so_far = 0
-                for iss in jira_issues:
-                    k = iss.get("Key", "")
-                    for jc in jira_comments_by_key.get(k, []):
-                        if total_so_far >= max_jc:
-                            break
-                        shown_jira.append((k, jc))
-                        total_so_far += 1
-
-                issue_shown = [jc for k, jc in shown_jira if k == key]
+                issue_shown = shown_by_key.get(key, [])
                 if issue_shown:
-                    lines.append("    Comments:")
+                    block = {"header": "    Comments:", "items": []}
                     for jc in issue_shown:
-                        lines.append(
-                            f"      [{jc.get('Created', '')}] {jc.get('AuthorDisplayName', '')} | "
-                            f"{self._trunc(jc.get('Body'), 800)}"
-                        )
+                        block["items"].append(item(
+                            "jira_comments", jc.get("Created"),
+                            f"      [{jc.get('Created', '')}] {jc.get('AuthorDisplayName', '')} | ", jc.get("Body"), 800,
+                        ))
+                    lines.append(block)
         else:
             lines.append("No Jira tickets found for this opportunity.")
         lines.append("")
@@ -277,36 +399,61 @@ class Analyzer:
                 url = call.get("Gong__View_call__c")
                 if url:
                     lines.append(f"    Gong URL: {url}")
-                brief = self._trunc(call.get("Gong__Call_Brief__c"), 1000)
-                if brief:
-                    lines.append(f"    Brief: {brief}")
-                key_points = self._trunc(call.get("Gong__Call_Key_Points__c"), 1000)
-                if key_points:
-                    lines.append(f"    Key Points: {key_points}")
-                next_steps = self._trunc(call.get("Gong__Call_Highlights_Next_Steps__c"), 800)
-                if next_steps:
-                    lines.append(f"    Next Steps: {next_steps}")
-                transcript = self._trunc(call.get("Call_Transcript__c"), max_transcript)
-                if transcript:
-                    lines.append(f"    Transcript:\n{transcript}")
+                for label, field, cap in (("Brief", "Gong__Call_Brief__c", 1000),
+                                          ("Key Points", "Gong__Call_Key_Points__c", 1000),
+                                          ("Next Steps", "Gong__Call_Highlights_Next_Steps__c", 800)):
+                    if self._trunc(call.get(field), cap):
+                        lines.append(item("gong_summaries", call_date, f"    {label}: ", call.get(field), cap))
+                if self._trunc(call.get("Call_Transcript__c"), max_transcript):
+                    lines.append(item("transcripts", call_date, "    Transcript:\n",
+                                      call.get("Call_Transcript__c"), max_transcript))
         else:
             lines.append("No Gong calls found for this opportunity.")
         lines.append("")
 
+        # --- Fit the items into what the budget leaves after the fixed text ---
+        budget = int(cfg.get("prompt_token_budget", 0)) or None
+        if budget is not None:
+            fixed = [line for line in lines if isinstance(line, str)] + [instructions_text]
+            fixed += [line["header"] for line in lines if isinstance(line, dict) and "items" in line]
+            # Leave room for the note listing what was left out
+            budget = max(budget - sum(estimate_tokens(line) + 1 for line in fixed) - 60, 0)
+        report = self._fit_budget(items, budget)
+        self.last_prompt_report = report
+
         # --- Analysis instructions (loaded from analysis_instructions.md) ---
+        note = self._omitted_note(report)
+        if note:
+            lines.append(note)
         lines.append(instructions_text)
 
-        return "\n".join(lines)
+        return "\n".join(self._render(lines))
 
     # ------------------------------------------------------------------
     # API call
     # ------------------------------------------------------------------
 
-    def analyze(self, data: dict) -> str:
+    def analyze(self, data: dict, refresh: bool = False) -> str:
+        """Return the analysis of data, from the cache when the same prompt was analyzed before.
+
+        refresh skips the cache lookup and replaces the cached analysis with a new one.
+        """
         prompt = self.build_prompt(data)
+        key = None
+        if self.cache is not None:
+            from analysis_cache import cache_key
+            key = cache_key(prompt, self._model, self._max_tokens)
+            if not refresh:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return cached[0]
+
         message = self._client.messages.create(
             model=self._model,
-            max_tokens=4096,
+            max_tokens=self._max_tokens,
             messages=[{"role": "user", "content": prompt}],
         )
-        return message.content[0].text
+        text = message.content[0].text
+        if key is not None:
+            self.cache.put(key, self._model, text)
+        return text
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+BatchPipeline — analyzes every opportunity of a listing unattended, e.g. overnight.
+
+Collection workers gather each opportunity's data into a bounded queue, analysis workers
+drain it and call Claude, retrying with backoff on rate limits. Each analysis is written
+to its own file in the output directory.
+"""
+
+import argparse
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Optional
+
+from opp_summary import _get_opp_type, _load_config
+
+# HTTP statuses worth retrying: rate limited, overloaded and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+RETRY_ERRORS = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError", "OverloadedError"}
+
+_DONE = object()
+
+
+class StubClient:
+    """Stands in for anthropic.Anthropic so a batch can run without calling the API."""
+
+    def __init__(self, delay: float = 0.0):
+        self.messages = self
+        self._delay = delay
+
+    def create(self, model: str, max_tokens: int, messages: list) -> SimpleNamespace:
+        time.sleep(self._delay)
+        prompt = messages[0]["content"]
+        text = f"[stub analysis from {model}: {len(prompt)} prompt chars]"
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return status in RETRY_STATUSES or type(error).__name__ in RETRY_ERRORS
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the API asked us to wait, from the retry-after header of the error's response."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def output_file_name(opp: dict) -> str:
+    safe = re.sub(r"[^\w.-]+", "_", str(opp.get("Name", ""))).strip("_")[:60]
+    return f"{safe}_{opp['Id']}.md" if safe else f"{opp['Id']}.md"
+
+
+class BatchPipeline:
+    def __init__(self, collector, analyzer, config: dict, out_dir: str, concurrency: int = 2,
+                 refresh: bool = False):
+        self._collector = collector
+        self._analyzer = analyzer
+        self._out_dir = out_dir
+        self._concurrency = max(concurrency, 1)
+        self._refresh = refresh
+        self._collect_workers = max(int(config.get("batch_collect_workers", 2)), 1)
+        self._queries_per_collection = max(int(config.get("max_concurrent_queries", 4)), 1)
+        self._queue_size = max(int(config.get("batch_queue_size", 4)), 1)
+        self._max_retries = int(config.get("batch_max_retries", 5))
+        self._backoff = float(config.get("batch_retry_base_seconds", 2.0))
+        self._lock = threading.Lock()
+        self.written: list[str] = []
+        self.failed: list[str] = []
+
+    def _log(self, message: str) -> None:
+        with self._lock:
+            print(message, flush=True)
+
+    def _fail(self, opp: dict, stage: str, error: Exception) -> None:
+        with self._lock:
+            self.failed.append(opp["Id"])
+        self._log(f"  {opp.get('Name', opp['Id'])}: {stage} failed: {error}")
+
+    def _collect(self, opps: queue.Queue, ready: queue.Queue) -> None:
+        """Collection worker: gather data for opps until the list runs out; put blocks while the queue is full."""
+        while True:
+            try:
+                opp = opps.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                data = self._collector.collect_all(opp)
+            except Exception as e:
+                self._fail(opp, "collection", e)
+                continue
+            data["opp_type"] = _get_opp_type(opp)
+            self._log(f"  collected {opp.get('Name', opp['Id'])}")
+            ready.put(data)
+
+    def _analyze_with_retry(self, data: dict) -> str:
+        attempt = 0
+        while True:
+            try:
+                return self._analyzer.analyze(data, refresh=self._refresh)
+            except Exception as e:
+                if attempt >= self._max_retries or not is_retryable(e):
+                    raise
+                delay = retry_after(e) or self._backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+                attempt += 1
+                self._log(f"  {data['opp'].get('Name', '')}: {type(e).__name__}, retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _analyze(self, ready: queue.Queue) -> None:
+        """Analysis worker: drain the queue until a _DONE marker arrives."""
+        while True:
+            data = ready.get()
+            if data is _DONE:
+                return
+            opp = data["opp"]
+            try:
+                analysis = self._analyze_with_retry(data)
+                path = self._write(data, analysis)
+            except Exception as e:
+                self._fail(opp, "analysis", e)
+                continue
+            with self._lock:
+                self.written.append(path)
+            self._log(f"  analyzed {opp.get('Name', opp['Id'])} -> {path}")
+
+    def _write(self, data: dict, analysis: str) -> str:
+        opp = data["opp"]
+        path = os.path.join(self._out_dir, output_file_name(opp))
+        lines = [f"# {opp.get('Name', '')}", "",
+                 f"- Id: {opp['Id']}",
+                 f"- Type: {data.get('opp_type', '')}",
+                 f"- Stage: {opp.get('StageName', '')}",
+                 f"- Amount: {opp.get('Amount', '')}",
+                 f"- Close date: {opp.get('CloseDate', '')}"]
+        if data.get("errors"):
+            lines.append(f"- Data warnings: {'; '.join(data['errors'])}")
+        lines += ["", analysis, ""]
+        # Write then rename so an interrupted run never leaves half a file
+        with open(path + ".tmp", "w") as f:
+            f.write("\n".join(lines))
+        os.replace(path + ".tmp", path)
+        return path
+
+    def run(self, opps: list[dict]) -> bool:
+        """Collect and analyze all opps. Returns False if any of them failed."""
+        os.makedirs(self._out_dir, exist_ok=True)
+        pending: queue.Queue = queue.Queue()
+        for opp in opps:
+            pending.put(opp)
+        ready: queue.Queue = queue.Queue(maxsize=self._queue_size)
+
+        collect_workers = min(self._collect_workers, len(opps)) or 1
+        # Each collection runs max_concurrent_queries queries, every one needs its own connection
+        self._collector.reserve_connections(collect_workers * self._queries_per_collection)
+        collectors = [threading.Thread(target=self._collect, args=(pending, ready), daemon=True)
+                      for _ in range(collect_workers)]
+        analyzers = [threading.Thread(target=self._analyze, args=(ready,), daemon=True)
+                     for _ in range(self._concurrency)]
+        for thread in collectors + analyzers:
+            thread.start()
+        for thread in collectors:
+            thread.join()
+        for _ in analyzers:
+            ready.put(_DONE)
+        for thread in analyzers:
+            thread.join()
+        return not self.failed
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a whole listing of opportunities into one file each.")
+    parser.add_argument("--batch", choices=["open", "closed"], required=True,
+                        help="open: open opps closing this quarter, closed: closed in the last two quarters")
+    parser.add_argument("--out", default="analyses", help="directory for the analysis files")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="concurrent Claude calls (default: batch_concurrency in config.json)")
+    parser.add_argument("--stub-llm", action="store_true", help="use a local stub instead of the Anthropic API")
+    parser.add_argument("--refresh", action="store_true", help="re-analyze opps that have a cached analysis")
+    args = parser.parse_args(argv)
+
+    try:
+        config = _load_config()
+    except Exception as e:
+        print(f"Error loading config.json: {e}")
+        return 1
+
+    try:
+        from analyzer import Analyzer
+        analyzer = Analyzer(config, client=StubClient() if args.stub_llm else None)
+    except Exception as e:
+        print(f"Error initializing analyzer: {e}")
+        return 1
+
+    print("Connecting to Salesforce and Jira...", flush=True)
+    try:
+        from data_collector import DataCollector
+        collector = DataCollector(config)
+    except Exception as e:
+        print(f"Connection error: {e}")
+        return 1
+
+    try:
+        if args.batch == "open":
+            opps = collector.get_open_opps_this_quarter()
+        else:
+            opps = collector.get_closed_opps_recent_quarters()
+    except Exception as e:
+        print(f"Error fetching opportunities: {e}")
+        return 1
+
+    concurrency = args.concurrency or int(config.get("batch_concurrency", 2))
+    print(f"Analyzing {len(opps)} opportunities, {concurrency} at a time, into {args.out}/", flush=True)
+    start = time.time()
+    pipeline = BatchPipeline(collector, analyzer, config, args.out, concurrency, refresh=args.refresh)
+    ok = pipeline.run(opps)
+    print(f"Done in {time.time() - start:.0f}s: {len(pipeline.written)} written, {len(pipeline.failed)} failed")
+    if analyzer.cache is not None:
+        stats = analyzer.cache.stats()
+        print(f"Analysis cache: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evicted, "
+              f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KB)")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of Analyzer.build_prompt over synthetic Jira issues and comments.
+
+Prompt assembly should scale linearly with the number of issues: the time per comment
+must stay flat as the input grows. Exits with 1 if it grows more than MAX_GROWTH times.
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from analyzer import Analyzer
+from batch_pipeline import StubClient
+
+MAX_GROWTH = 3.0
+
+
+def synthetic_data(issues: int, comments_per_issue: int) -> dict:
+    start = datetime(2026, 1, 1)
+    jira_issues = [
+        {"Key": f"SUP-{i}", "Summary": f"Issue {i}", "StatusName": "Open", "PriorityName": "Major",
+         "IssueTypeName": "Bug", "Description": "Steps to reproduce " * 20, "Updated": start + timedelta(hours=i)}
+        for i in range(issues)
+    ]
+    jira_comments = [
+        {"IssueKey": f"SUP-{i}", "AuthorDisplayName": "Support", "Created": start + timedelta(minutes=i * 60 + c),
+         "Body": "Investigated and added logs. " * 10}
+        for i in range(issues)
+        for c in range(comments_per_issue)
+    ]
+    return {"opp": {"Id": "bench", "Name": "Benchmark", "Amount": 100000.0}, "opp_type": "Open",
+            "jira_issues": jira_issues, "jira_comments": jira_comments}
+
+
+def time_build(analyzer: Analyzer, data: dict, repeat: int) -> float:
+    """Best of repeat runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        analyzer.build_prompt(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark prompt assembly over synthetic Jira data.")
+    parser.add_argument("--sizes", default="50,100,200,400,800", help="comma-separated issue counts")
+    parser.add_argument("--comments", type=int, default=10, help="comments per issue")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per size, the best is kept")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    # No comment cap and no token budget, so every comment goes through selection and rendering
+    config = {"claude_model": "bench", "max_jira_comments": max(sizes) * args.comments, "prompt_token_budget": 0}
+    analyzer = Analyzer(config, client=StubClient())
+
+    print(f"{'issues':>8} {'comments':>9} {'ms':>9} {'us/comment':>11}")
+    per_comment = []
+    for size in sizes:
+        data = synthetic_data(size, args.comments)
+        elapsed = time_build(analyzer, data, args.repeat)
+        per_comment.append(elapsed / (size * args.comments))
+        print(f"{size:>8} {size * args.comments:>9} {elapsed * 1000:>9.1f} {per_comment[-1] * 1e6:>11.2f}")
+
+    growth = per_comment[-1] / per_comment[0]
+    print(f"Time per comment grew {growth:.2f}x from {sizes[0]} to {sizes[-1]} issues "
+          f"({'linear' if growth <= MAX_GROWTH else 'NOT linear'}, limit {MAX_GROWTH:.0f}x)")
+    return 0 if growth <= MAX_GROWTH else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
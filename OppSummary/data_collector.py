@@ -6,7 +6,9 @@ DataCollector — fetches Salesforce and Jira data for an opportunity.
 import os
 import re
 import sys
-from datetime import date, timedelta
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, Optional
 
 
 def _bootstrap_connection_manager():
@@ -21,6 +23,50 @@ def _bootstrap_connection_manager():
 _bootstrap_connection_manager()
 from connection_manager import ConnectionManager  # noqa: E402
 
+from local_store import LocalStore, stamp  # noqa: E402
+
+
+# Label of each collect_all step in error messages
+STEP_LABELS = {
+    "products": "products",
+    "cases": "cases",
+    "emails": "emails",
+    "comments": "case comments",
+    "jira_issues": "jira issues",
+    "jira_comments": "jira comments",
+    "sync_trials": "sync trials",
+    "cloud_trials": "cloud trials",
+    "gong_calls": "gong calls",
+}
+
+
+# Objects mirrored in the local store: the row id and parent columns, the modified columns
+# that make up the high-water mark, the delta filter and the order the live query returns
+STORE_OBJECTS = {
+    "products": {"id": "Id", "parent": "OppId", "modified": ["LastModifiedDate"],
+                 "since": "oli.[LastModifiedDate] >= '{since}'", "order": [], "desc": False},
+    "cases": {"id": "CaseId", "parent": "OppId", "modified": ["LastModifiedDate"],
+              "since": "c.[LastModifiedDate] >= '{since}'", "order": ["CreatedDate"], "desc": True},
+    "emails": {"id": "Id", "parent": "ParentId", "modified": ["LastModifiedDate"],
+               "since": "em.[LastModifiedDate] >= '{since}'", "order": ["MessageDate"], "desc": False},
+    "comments": {"id": "Id", "parent": "ParentId", "modified": ["LastModifiedDate"],
+                 "since": "cc.[LastModifiedDate] >= '{since}'", "order": ["CreatedDate"], "desc": False},
+    "jira_issues": {"id": "Key", "parent": "Key", "modified": ["Updated"],
+                    "since": "[Updated] >= '{since}'", "order": [], "desc": False},
+    "jira_comments": {"id": "Id", "parent": "IssueKey", "modified": ["Updated"],
+                      "since": "[Updated] >= '{since}'", "order": ["IssueKey", "Created"], "desc": False},
+    "sync_trials": {"id": "Id", "parent": "OppId", "modified": ["LastModifiedDate"],
+                    "since": "t.[LastModifiedDate] >= '{since}'", "order": ["TrialDate__c"], "desc": True},
+    "cloud_trials": {"id": "Id", "parent": "OppId", "modified": ["LastModifiedDate"],
+                     "since": "t.[LastModifiedDate] >= '{since}'", "order": ["TrialDate__c"], "desc": True},
+    # A call newly linked to an opportunity only changes the junction row
+    "gong_calls": {"id": "Id", "parent": "OppId", "modified": ["LastModifiedDate", "LinkLastModifiedDate"],
+                   "since": "(c.[LastModifiedDate] >= '{since}' OR ro.[LastModifiedDate] >= '{since}')",
+                   "order": ["Gong__Call_Start__c"], "desc": True},
+}
+
+STORE_CLOCK_MARGIN = timedelta(hours=1)
+
 
 class DataCollector:
     def __init__(self, config: dict):
@@ -36,29 +82,39 @@ class DataCollector:
         if not success:
             raise RuntimeError(f"Failed to connect to Jira ('{config['jira_connection']}')")
 
+        self._store = None
+        store_path = config.get("local_store")
+        if store_path:
+            if not os.path.isabs(store_path):
+                store_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), store_path)
+            self._store = LocalStore(store_path)
+
     # ------------------------------------------------------------------
     # Private helpers
     # ------------------------------------------------------------------
 
+    def reserve_connections(self, count: int) -> None:
+        """Grow the Salesforce and Jira pools to count connections, for callers running collections in parallel."""
+        self._sf_cm.get_pool(max_size=count)
+        self._jira_cm.get_pool(max_size=count)
+
+    @staticmethod
+    def _execute(cm, sql: str) -> list[dict]:
+        """Run a query on a pooled connection, so concurrent queries never share one."""
+        with cm.get_pool().connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql)
+                columns = [desc[0] for desc in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+
     def _execute_sf(self, sql: str) -> list[dict]:
-        conn = self._sf_cm.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(sql)
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        finally:
-            cursor.close()
+        return self._execute(self._sf_cm, sql)
 
     def _execute_jira(self, sql: str) -> list[dict]:
-        conn = self._jira_cm.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(sql)
-            columns = [desc[0] for desc in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        finally:
-            cursor.close()
+        return self._execute(self._jira_cm, sql)
 
     @staticmethod
     def _quarter_bounds(offset: int = 0) -> tuple[str, str]:
@@ -87,6 +143,60 @@ class DataCollector:
         escaped = ", ".join(f"'{str(i).replace(chr(39), chr(39)*2)}'" for i in ids)
         return f"({escaped})"
 
+    def _chunks(self, ids: list[str]) -> list[list[str]]:
+        """Split ids into lists of at most max_in_clause_ids, to keep IN clauses under the query length limits."""
+        size = max(int(self._config.get("max_in_clause_ids", 200)), 1)
+        unique = list(dict.fromkeys(ids))
+        return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+    def _execute_in(self, execute, build_sql, ids: list[str], store_object: Optional[str] = None) -> list[dict]:
+        """Run build_sql(in_clause, since) for ids, through the local store when store_object is mirrored."""
+        if self._store is None or store_object is None:
+            return self._fetch_in(execute, build_sql, ids, "")
+        return self._sync_stored(store_object, execute, build_sql, ids)
+
+    def _fetch_in(self, execute, build_sql, ids: list[str], since: str) -> list[dict]:
+        """Run build_sql once per chunk of ids and concatenate the rows."""
+        rows = []
+        for chunk in self._chunks(ids):
+            rows.extend(execute(build_sql(self._in_clause(chunk), since).strip()))
+        return rows
+
+    def _sync_stored(self, store_object: str, execute, build_sql, ids: list[str]) -> list[dict]:
+        """Pull new parents in full and known ones since their high-water mark, then serve from the store."""
+        spec = STORE_OBJECTS[store_object]
+        parents = list(dict.fromkeys(str(i) for i in ids))
+        marks = self._store.high_water_marks(store_object, parents)
+        # Everything modified before the sync started, less a margin for clock skew with the source,
+        # has been seen once the queries succeed
+        synced_mark = (datetime.now(timezone.utc) - STORE_CLOCK_MARGIN).isoformat(timespec="seconds")
+
+        new = [p for p in parents if p not in marks]
+        known = [p for p in parents if p in marks]
+        fetched = self._fetch_in(execute, build_sql, new, "") if new else []
+        if known:
+            # One delta query from the oldest mark; rows already stored are simply replaced
+            since = min(marks[p] for p in known).replace("'", "''")
+            fetched += self._fetch_in(execute, build_sql, known, "\n  AND " + spec["since"].format(since=since))
+
+        # Every queried parent moves up to the sync start, or to a newer row stamp, so a parent
+        # without recent changes doesn't hold the next delta query back at its last modified row
+        new_marks = {parent: synced_mark for parent in parents}
+        rows = []
+        for row in fetched:
+            parent = str(row.get(spec["parent"]))
+            rows.append((parent, str(row.get(spec["id"])), row))
+            for column in spec["modified"]:
+                value = stamp(row.get(column))
+                if value and value > new_marks.get(parent, ""):
+                    new_marks[parent] = value
+        self._store.save(store_object, rows, new_marks)
+
+        stored = self._store.rows(store_object, parents)
+        if spec["order"]:
+            stored.sort(key=lambda r: tuple(str(r.get(c) or "") for c in spec["order"]), reverse=spec["desc"])
+        return stored
+
     @staticmethod
     def _extract_jira_keys(cases: list[dict]) -> list[str]:
         """Pull Jira issue keys from JIRA_Reference__c URLs; deduplicate; ignore nulls."""
@@ -141,86 +251,95 @@ ORDER BY o.[CloseDate] DESC
         return self._execute_sf(sql.strip())
 
     def get_opp_products(self, opp_id: str) -> list[dict]:
-        sql = f"""
-SELECT oli.[Name], oli.[ProductCode], oli.[Application__c], oli.[Product_Group__c],
+        return self.get_products_for_opps([opp_id])
+
+    def get_products_for_opps(self, opp_ids: list[str]) -> list[dict]:
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT oli.[OpportunityId] AS OppId, oli.[Id], oli.[LastModifiedDate], oli.[Name], oli.[ProductCode], oli.[Application__c], oli.[Product_Group__c],
        oli.[Edition__c], oli.[Product_Lifecycle__c], oli.[Quantity],
        oli.[UnitPrice], oli.[TotalPrice], oli.[ACV__c], oli.[NewBusiness__c]
 FROM [OpportunityLineItem] oli
-WHERE oli.[OpportunityId] = '{opp_id}'
-"""
-        return self._execute_sf(sql.strip())
+WHERE oli.[OpportunityId] IN {ids}{since}
+""", opp_ids, "products")
 
     def get_opp_cases(self, opp_id: str) -> list[dict]:
-        sql = f"""
-SELECT c.[Id] AS CaseId, c.[CaseNumber], c.[Subject], c.[Status], c.[JIRA_Reference__c]
+        return self.get_cases_for_opps([opp_id])
+
+    def get_cases_for_opps(self, opp_ids: list[str]) -> list[dict]:
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT o.[Id] AS OppId, c.[Id] AS CaseId, c.[CaseNumber], c.[Subject], c.[Status], c.[JIRA_Reference__c],
+       c.[CreatedDate], c.[LastModifiedDate]
 FROM [Opportunity] o
 INNER JOIN [Account] a ON o.[AccountId] = a.[Id]
 INNER JOIN [Case] c    ON c.[AccountId] = a.[Id]
-WHERE o.[Id] = '{opp_id}'
+WHERE o.[Id] IN {ids}{since}
 ORDER BY c.[CreatedDate] DESC
-"""
-        return self._execute_sf(sql.strip())
+""", opp_ids, "cases")
 
     def get_case_emails(self, case_ids: list[str]) -> list[dict]:
-        sql = f"""
-SELECT em.[MessageDate], em.[FromName], em.[Subject], em.[Incoming], em.[TextBody]
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT em.[Id], em.[ParentId], em.[LastModifiedDate], em.[MessageDate], em.[FromName], em.[Subject], em.[Incoming], em.[TextBody]
 FROM [EmailMessage] em
-WHERE em.[ParentId] IN {self._in_clause(case_ids)}
+WHERE em.[ParentId] IN {ids}{since}
 ORDER BY em.[MessageDate] ASC
-"""
-        return self._execute_sf(sql.strip())
+""", case_ids, "emails")
 
     def get_case_comments(self, case_ids: list[str]) -> list[dict]:
-        sql = f"""
-SELECT cc.[CreatedDate], cc.[IsPublished], cc.[CommentBody], cc.[ParentId]
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT cc.[Id], cc.[CreatedDate], cc.[LastModifiedDate], cc.[IsPublished], cc.[CommentBody], cc.[ParentId]
 FROM [CaseComment] cc
-WHERE cc.[ParentId] IN {self._in_clause(case_ids)}
+WHERE cc.[ParentId] IN {ids}{since}
 ORDER BY cc.[CreatedDate] ASC
-"""
-        return self._execute_sf(sql.strip())
+""", case_ids, "comments")
 
     def get_jira_issues(self, keys: list[str]) -> list[dict]:
-        sql = f"""
+        return self._execute_in(self._execute_jira, lambda ids, since: f"""
 SELECT [Key], [Summary], [Description], [StatusName], [PriorityName],
        [IssueTypeName], [AssigneeDisplayName], [ReporterDisplayName],
        [Created], [Updated], [ResolutionDate], [ResolutionName],
        [Environment], [Labels], [ComponentsAggregate], [FixVersionsAggregate],
        [TimeSpent], [ItemURL]
 FROM [Issues]
-WHERE [Key] IN {self._in_clause(keys)}
-"""
-        return self._execute_jira(sql.strip())
+WHERE [Key] IN {ids}{since}
+""", keys, "jira_issues")
 
     def get_jira_comments(self, keys: list[str]) -> list[dict]:
-        sql = f"""
-SELECT [IssueKey], [AuthorDisplayName], [Created], [Body]
+        return self._execute_in(self._execute_jira, lambda ids, since: f"""
+SELECT [Id], [IssueKey], [AuthorDisplayName], [Created], [Updated], [Body]
 FROM [Comments]
-WHERE [IssueKey] IN {self._in_clause(keys)}
+WHERE [IssueKey] IN {ids}{since}
 ORDER BY [IssueKey], [Created] ASC
-"""
-        return self._execute_jira(sql.strip())
+""", keys, "jira_comments")
 
     def get_sync_trials(self, opp_id: str) -> list[dict]:
-        sql = f"""
-SELECT t.[Serial__c], t.[Product__c], t.[DataSource__c], t.[Destination__c],
+        return self.get_sync_trials_for_opps([opp_id])
+
+    def get_sync_trials_for_opps(self, opp_ids: list[str]) -> list[dict]:
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT o.[Id] AS OppId, t.[Id], t.[LastModifiedDate], t.[Serial__c], t.[Product__c], t.[DataSource__c], t.[Destination__c],
        t.[JobType__c], t.[TrialDate__c], t.[LicExpiration__c], t.[LastQueryDate__c],
        t.[TotalSuccesses__c], t.[TotalFailures__c], t.[TotalRecordCount__c],
        t.[ConnectorCount__c], t.[Connectors__c], t.[IsExpired__c], t.[Platform__c]
 FROM [Trial__c] t
 INNER JOIN [Contact] c ON t.[Contact__c] = c.[Id]
 INNER JOIN [Opportunity] o ON o.[AccountId] = c.[AccountId]
-WHERE o.[Id] = '{opp_id}'
+WHERE o.[Id] IN {ids}{since}
   AND t.[Serial__c] IS NOT NULL
   AND t.[Product__c] <> 'cloud'
 ORDER BY t.[TrialDate__c] DESC
-"""
-        return self._execute_sf(sql.strip())
+""", opp_ids, "sync_trials")
 
     def get_gong_calls(self, opp_id: str) -> list[dict]:
         """Fetch all Gong calls linked to this opportunity via the junction table."""
-        sql = f"""
+        return self.get_gong_calls_for_opps([opp_id])
+
+    def get_gong_calls_for_opps(self, opp_ids: list[str]) -> list[dict]:
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
 SELECT
+    ro.[Gong__Related_Entity_ID__c] AS OppId,
     c.[Id],
+    c.[LastModifiedDate],
+    ro.[LastModifiedDate] AS LinkLastModifiedDate,
     c.[Name],
     c.[Gong__Call_Start__c],
     c.[Gong__Call_Duration__c],
@@ -234,47 +353,47 @@ SELECT
 FROM [Gong__Gong_Call__c] c
 INNER JOIN [Gong__Related_Opportunity__c] ro
     ON ro.[Gong__Gong_Interaction__c] = c.[Id]
-WHERE ro.[Gong__Related_Entity_ID__c] = '{opp_id}'
+WHERE ro.[Gong__Related_Entity_ID__c] IN {ids}{since}
   AND c.[IsDeleted] = 0
 ORDER BY c.[Gong__Call_Start__c] DESC
-"""
-        return self._execute_sf(sql.strip())
+""", opp_ids, "gong_calls")
 
     def get_cloud_trials(self, opp_id: str) -> list[dict]:
-        sql = f"""
-SELECT t.[Serial__c], t.[Cloud_AccountId__c], t.[DataSource__c], t.[Destination__c],
+        return self.get_cloud_trials_for_opps([opp_id])
+
+    def get_cloud_trials_for_opps(self, opp_ids: list[str]) -> list[dict]:
+        return self._execute_in(self._execute_sf, lambda ids, since: f"""
+SELECT o.[Id] AS OppId, t.[Id], t.[LastModifiedDate], t.[Serial__c], t.[Cloud_AccountId__c], t.[DataSource__c], t.[Destination__c],
        t.[TrialDate__c], t.[LicExpiration__c], t.[LastQueryDate__c],
        t.[TotalSuccesses__c], t.[TotalFailures__c], t.[TotalRecordCount__c],
        t.[ConnectorCount__c], t.[Connectors__c], t.[IsExpired__c]
 FROM [Trial__c] t
 INNER JOIN [Contact] c ON t.[Contact__c] = c.[Id]
 INNER JOIN [Opportunity] o ON o.[AccountId] = c.[AccountId]
-WHERE o.[Id] = '{opp_id}'
+WHERE o.[Id] IN {ids}{since}
   AND t.[Product__c] = 'cloud'
 ORDER BY t.[TrialDate__c] DESC
-"""
-        return self._execute_sf(sql.strip())
+""", opp_ids, "cloud_trials")
 
     def get_preview_counts(self, opp_ids: list[str]) -> dict:
         """Return {opp_id: {cases: N, emails: N, jira: N}} for all given opp IDs.
 
-        Uses two batch queries so cost is constant regardless of list length.
+        Uses two batch queries, chunked by max_in_clause_ids, so cost barely grows with list length.
         Silently returns zeros on any error so the listing can still be shown.
         """
         result = {opp_id: {"cases": 0, "emails": 0, "jira": 0} for opp_id in opp_ids}
         if not opp_ids:
             return result
 
-        # --- cases + jira refs (one query) ---
-        case_sql = f"""
+        # --- cases + jira refs (chunked query) ---
+        try:
+            case_rows = self._execute_in(self._execute_sf, lambda ids, since: f"""
 SELECT o.[Id] AS OppId, c.[Id] AS CaseId, c.[JIRA_Reference__c]
 FROM [Opportunity] o
 INNER JOIN [Account] a ON o.[AccountId] = a.[Id]
 INNER JOIN [Case] c    ON c.[AccountId] = a.[Id]
-WHERE o.[Id] IN {self._in_clause(opp_ids)}
-"""
-        try:
-            case_rows = self._execute_sf(case_sql.strip())
+WHERE o.[Id] IN {ids}
+""", opp_ids)
         except Exception:
             return result
 
@@ -294,16 +413,15 @@ WHERE o.[Id] IN {self._in_clause(opp_ids)}
         for oid, keys in jira_per_opp.items():
             result[oid]["jira"] = len(keys)
 
-        # --- email counts (one query, only ParentId — no body fetched) ---
+        # --- email counts (chunked query, only ParentId — no body fetched) ---
         all_case_ids = list(case_to_opp.keys())
         if all_case_ids:
-            email_sql = f"""
+            try:
+                for row in self._execute_in(self._execute_sf, lambda ids, since: f"""
 SELECT em.[ParentId] AS CaseId
 FROM [EmailMessage] em
-WHERE em.[ParentId] IN {self._in_clause(all_case_ids)}
-"""
-            try:
-                for row in self._execute_sf(email_sql.strip()):
+WHERE em.[ParentId] IN {ids}
+""", all_case_ids):
                     oid = case_to_opp.get(row["CaseId"])
                     if oid:
                         result[oid]["emails"] += 1
@@ -316,11 +434,9 @@ WHERE em.[ParentId] IN {self._in_clause(all_case_ids)}
     # Orchestrator
     # ------------------------------------------------------------------
 
-    def collect_all(self, opp: dict) -> dict:
-        opp_id = opp["Id"]
-        max_cases = self._config.get("max_cases_per_opp", 10)
-
-        result = {
+    @staticmethod
+    def _empty_result(opp: dict) -> dict:
+        return {
             "opp": opp,
             "products": [],
             "cases": [],
@@ -335,57 +451,151 @@ WHERE em.[ParentId] IN {self._in_clause(all_case_ids)}
             "errors": [],
         }
 
-        try:
-            result["products"] = self.get_opp_products(opp_id)
-        except Exception as e:
-            result["errors"].append(f"products: {e}")
+    def collect_all(self, opp: dict, progress: Optional[Callable] = None) -> dict:
+        """Collect everything about an opportunity, running independent queries concurrently.
 
-        try:
-            all_cases = self.get_opp_cases(opp_id)
-            result["total_cases_found"] = len(all_cases)
-            result["cases"] = all_cases[:max_cases]
-        except Exception as e:
-            result["errors"].append(f"cases: {e}")
-
-        case_ids = [c["CaseId"] for c in result["cases"] if c.get("CaseId")]
-
-        if case_ids:
-            try:
-                result["emails"] = self.get_case_emails(case_ids)
-            except Exception as e:
-                result["errors"].append(f"emails: {e}")
+        Products, cases, trials and Gong calls start together; emails, case comments and the
+        Jira queries start as soon as the cases they depend on are in. progress(step, rows, error)
+        is called from this thread as each step finishes; rows and error are both None for a
+        step that was skipped.
+        """
+        opp_id = opp["Id"]
+        max_cases = self._config.get("max_cases_per_opp", 10)
+        workers = self._config.get("max_concurrent_queries", 4)
+
+        result = self._empty_result(opp)
+
+        def report(step, rows, error):
+            if progress is not None:
+                progress(step, rows, error)
+
+        # Give every worker its own Salesforce and Jira connection
+        self.reserve_connections(workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+
+            def submit(step, fn, arg):
+                pending[executor.submit(fn, arg)] = step
+
+            submit("products", self.get_opp_products, opp_id)
+            submit("cases", self.get_opp_cases, opp_id)
+            submit("sync_trials", self.get_sync_trials, opp_id)
+            submit("cloud_trials", self.get_cloud_trials, opp_id)
+            submit("gong_calls", self.get_gong_calls, opp_id)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = pending.pop(future)
+                    try:
+                        rows = future.result()
+                    except Exception as e:
+                        result["errors"].append(f"{STEP_LABELS[step]}: {e}")
+                        report(step, None, e)
+                        if step == "cases":
+                            for dependent in ("emails", "comments", "jira_issues", "jira_comments"):
+                                report(dependent, None, None)
+                        continue
+
+                    # Cases are reported before they are cut to max_cases, so the total is known
+                    report(step, rows, None)
+                    if step == "cases":
+                        result["total_cases_found"] = len(rows)
+                        rows = rows[:max_cases]
+                    result[step] = rows
+
+                    if step == "cases":
+                        case_ids = [c["CaseId"] for c in rows if c.get("CaseId")]
+                        jira_keys = self._extract_jira_keys(rows)
+                        for dependent, fn, arg in (("emails", self.get_case_emails, case_ids),
+                                                   ("comments", self.get_case_comments, case_ids),
+                                                   ("jira_issues", self.get_jira_issues, jira_keys),
+                                                   ("jira_comments", self.get_jira_comments, jira_keys)):
+                            if arg:
+                                submit(dependent, fn, arg)
+                            else:
+                                report(dependent, None, None)
 
-            try:
-                result["comments"] = self.get_case_comments(case_ids)
-            except Exception as e:
-                result["errors"].append(f"case comments: {e}")
+        return result
 
-        jira_keys = self._extract_jira_keys(result["cases"])
+    def collect_many(self, opp_ids: list[str], opps: Optional[list[dict]] = None) -> dict:
+        """Collect everything about a set of opportunities with a few IN-clause queries per entity.
 
-        if jira_keys:
-            try:
-                result["jira_issues"] = self.get_jira_issues(jira_keys)
-            except Exception as e:
-                result["errors"].append(f"jira issues: {e}")
+        Returns {opp_id: result} in opp_ids order, each result shaped like collect_all's.
+        opps are the Opportunity rows to put in the results; an opp without one gets {"Id": opp_id}.
+        A failed query is recorded in the errors of every opportunity it covered.
+        """
+        max_cases = self._config.get("max_cases_per_opp", 10)
+        workers = self._config.get("max_concurrent_queries", 4)
+        opp_rows = {o["Id"]: o for o in opps or []}
+        results = {oid: self._empty_result(opp_rows.get(oid, {"Id": oid})) for oid in opp_ids}
+        if not results:
+            return results
+        ids = list(results)
+
+        def fail(step, e, oids):
+            for oid in oids:
+                results[oid]["errors"].append(f"{STEP_LABELS[step]}: {e}")
+
+        self.reserve_connections(workers)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            by_opp = {
+                "products": executor.submit(self.get_products_for_opps, ids),
+                "cases": executor.submit(self.get_cases_for_opps, ids),
+                "sync_trials": executor.submit(self.get_sync_trials_for_opps, ids),
+                "cloud_trials": executor.submit(self.get_cloud_trials_for_opps, ids),
+                "gong_calls": executor.submit(self.get_gong_calls_for_opps, ids),
+            }
 
             try:
-                result["jira_comments"] = self.get_jira_comments(jira_keys)
+                for row in by_opp["cases"].result():
+                    opp_result = results.get(row["OppId"])
+                    if opp_result is not None:
+                        opp_result["total_cases_found"] += 1
+                        if len(opp_result["cases"]) < max_cases:
+                            opp_result["cases"].append(row)
             except Exception as e:
-                result["errors"].append(f"jira comments: {e}")
-
-        try:
-            result["sync_trials"] = self.get_sync_trials(opp_id)
-        except Exception as e:
-            result["errors"].append(f"sync trials: {e}")
-
-        try:
-            result["cloud_trials"] = self.get_cloud_trials(opp_id)
-        except Exception as e:
-            result["errors"].append(f"cloud trials: {e}")
-
-        try:
-            result["gong_calls"] = self.get_gong_calls(opp_id)
-        except Exception as e:
-            result["errors"].append(f"gong calls: {e}")
-
-        return result
+                fail("cases", e, ids)
+
+            # A case or Jira issue can belong to several opportunities of the same account
+            case_opps: dict[str, list[str]] = {}
+            key_opps: dict[str, list[str]] = {}
+            for oid, opp_result in results.items():
+                for case in opp_result["cases"]:
+                    if case.get("CaseId"):
+                        case_opps.setdefault(case["CaseId"], []).append(oid)
+                for key in self._extract_jira_keys(opp_result["cases"]):
+                    key_opps.setdefault(key, []).append(oid)
+
+            by_parent = {}
+            for step, fn, parent_opps, column in (
+                    ("emails", self.get_case_emails, case_opps, "ParentId"),
+                    ("comments", self.get_case_comments, case_opps, "ParentId"),
+                    ("jira_issues", self.get_jira_issues, key_opps, "Key"),
+                    ("jira_comments", self.get_jira_comments, key_opps, "IssueKey")):
+                if parent_opps:
+                    by_parent[step] = (executor.submit(fn, list(parent_opps)), parent_opps, column)
+
+            for step, future in by_opp.items():
+                if step == "cases":
+                    continue
+                try:
+                    for row in future.result():
+                        if row["OppId"] in results:
+                            results[row["OppId"]][step].append(row)
+                except Exception as e:
+                    fail(step, e, ids)
+
+            for step, (future, parent_opps, column) in by_parent.items():
+                try:
+                    for row in future.result():
+                        parent = row.get(column) or row.get(column.lower())
+                        for oid in parent_opps.get(parent, []):
+                            results[oid][step].append(row)
+                except Exception as e:
+                    fail(step, e, sorted({oid for oids in parent_opps.values() for oid in oids},
+                                         key=ids.index))
+
+        return results
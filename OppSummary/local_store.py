@@ -0,0 +1,99 @@
+"""
+LocalStore — SQLite mirror of the Salesforce and Jira rows fetched by DataCollector.
+
+Rows are kept per object and parent (e.g. the emails of a case), with the high-water mark of
+each parent's last sync, so a later run only asks the source for rows modified since then.
+"""
+
+import pickle
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def stamp(value) -> Optional[str]:
+    """ISO text of a LastModifiedDate/Updated value, comparable across rows and usable in SQL."""
+    if value is None or value == "":
+        return None
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class LocalStore:
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        # DataCollector runs its getters on worker threads; the lock serialises them
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+CREATE TABLE IF NOT EXISTS rows (
+    object TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    id     TEXT NOT NULL,
+    data   BLOB NOT NULL,
+    PRIMARY KEY (object, parent, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    object    TEXT NOT NULL,
+    parent    TEXT NOT NULL,
+    hwm       TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (object, parent)
+);
+""")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def high_water_marks(self, object_name: str, parents: list[str]) -> dict[str, str]:
+        """Return {parent: hwm} for the parents of object_name synced before; others are absent."""
+        marks = {}
+        with self._lock:
+            for i in range(0, len(parents), 500):
+                chunk = parents[i:i + 500]
+                cursor = self._db.execute(
+                    f"SELECT parent, hwm FROM sync_state WHERE object = ? "
+                    f"AND parent IN ({', '.join('?' * len(chunk))})",
+                    [object_name, *chunk],
+                )
+                marks.update(cursor.fetchall())
+        return marks
+
+    def save(self, object_name: str, rows: list[tuple[str, str, dict]], marks: dict[str, str]) -> None:
+        """Upsert (parent, id, row) tuples and record the new high-water mark of each synced parent."""
+        synced_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO rows (object, parent, id, data) VALUES (?, ?, ?, ?)",
+                [(object_name, parent, row_id, pickle.dumps(row)) for parent, row_id, row in rows],
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sync_state (object, parent, hwm, synced_at) VALUES (?, ?, ?, ?)",
+                [(object_name, parent, hwm, synced_at) for parent, hwm in marks.items()],
+            )
+
+    def rows(self, object_name: str, parents: list[str]) -> list[dict]:
+        """All stored rows of object_name under the given parents."""
+        result = []
+        with self._lock:
+            for i in range(0, len(parents), 500):
+                chunk = parents[i:i + 500]
+                cursor = self._db.execute(
+                    f"SELECT data FROM rows WHERE object = ? "
+                    f"AND parent IN ({', '.join('?' * len(chunk))})",
+                    [object_name, *chunk],
+                )
+                result.extend(pickle.loads(data) for (data,) in cursor.fetchall())
+        return result
+
+    def clear(self, object_name: Optional[str] = None) -> None:
+        """Forget the rows and sync state of one object, or of everything, forcing a full re-pull."""
+        with self._lock, self._db:
+            for table in ("rows", "sync_state"):
+                if object_name is None:
+                    self._db.execute(f"DELETE FROM {table}")
+                else:
+                    self._db.execute(f"DELETE FROM {table} WHERE object = ?", (object_name,))
@@ -3,6 +3,7 @@
 OppSummary — Interactive CLI for analyzing Salesforce opportunities.
 """
 
+import argparse
 import json
 import os
 import sys
@@ -100,134 +101,84 @@ def _step(label: str, result_str: str) -> None:
     print(f"  {label:<30} {result_str}", flush=True)
 
 
-def _gather_and_display(opp: dict, collector, config: dict, mode: str) -> dict:
-    print(f"\nGathering data for: {opp.get('Name', opp.get('Id', ''))}")
+def _date_str(value) -> str:
+    return value.date().isoformat() if hasattr(value, "date") else str(value or "")[:10]
 
-    # Products
-    try:
-        products = collector.get_opp_products(opp["Id"])
-        _step("Products...", f"OK ({len(products)} line items)")
-    except Exception as e:
-        products = []
-        _step("Products...", f"ERROR: {e}")
 
-    # Cases
-    max_cases = config.get("max_cases_per_opp", 10)
-    try:
-        all_cases = collector.get_opp_cases(opp["Id"])
-        total_cases = len(all_cases)
-        cases = all_cases[:max_cases]
-        if total_cases > max_cases:
-            _step("Cases...", f"{total_cases} found, using top {max_cases}")
+def _show_step(step: str, rows, error, max_cases: int) -> None:
+    """Print the progress line of a collect_all step as it finishes."""
+    labels = {
+        "products": "Products...",
+        "cases": "Cases...",
+        "emails": "Emails...",
+        "comments": "Case comments...",
+        "jira_issues": "Jira tickets...",
+        "jira_comments": "Jira comments...",
+        "sync_trials": "Sync trials...",
+        "cloud_trials": "Connect Cloud trials...",
+        "gong_calls": "Gong calls...",
+    }
+    label = labels[step]
+
+    if error is not None:
+        _step(label, f"ERROR: {error}")
+        return
+
+    if rows is None:
+        if step in ("emails", "comments"):
+            _step(label, "skipped (no cases)")
+        elif step == "jira_issues":
+            _step(label, "skipped (no Jira refs in cases)")
+        return
+
+    n = len(rows)
+    if step == "products":
+        _step(label, f"OK ({n} line items)")
+    elif step == "cases":
+        if n > max_cases:
+            _step(label, f"{n} found, using top {max_cases}")
         else:
-            _step("Cases...", f"{total_cases} found")
-        for c in cases:
-            num = c.get("CaseNumber", "")
-            subj = c.get("Subject", "")
-            print(f"    [#{num}] {subj}", flush=True)
-    except Exception as e:
-        cases = []
-        total_cases = 0
-        _step("Cases...", f"ERROR: {e}")
-
-    case_ids = [c["CaseId"] for c in cases if c.get("CaseId")]
-
-    # Emails
-    emails = []
-    if case_ids:
-        try:
-            emails = collector.get_case_emails(case_ids)
-            _step("Emails...", f"{len(emails)} found")
-            for em in emails:
-                md = em.get("MessageDate") or ""
-                date_str = md.date().isoformat() if hasattr(md, "date") else str(md)[:10]
-                subj = em.get("Subject", "")
-                print(f"    {date_str}  {subj}", flush=True)
-        except Exception as e:
-            _step("Emails...", f"ERROR: {e}")
-    else:
-        _step("Emails...", "skipped (no cases)")
-
-    # Case comments
-    comments = []
-    if case_ids:
-        try:
-            comments = collector.get_case_comments(case_ids)
-            _step("Case comments...", f"OK ({len(comments)})")
-        except Exception as e:
-            _step("Case comments...", f"ERROR: {e}")
-    else:
-        _step("Case comments...", "skipped (no cases)")
-
-    # Jira
-    jira_keys = collector._extract_jira_keys(cases)
-    jira_issues = []
-    jira_comments = []
-    if jira_keys:
-        try:
-            jira_issues = collector.get_jira_issues(jira_keys)
-            _step("Jira tickets...", f"OK ({len(jira_issues)} issues)")
-        except Exception as e:
-            _step("Jira tickets...", f"ERROR: {e}")
-        try:
-            jira_comments = collector.get_jira_comments(jira_keys)
-            # update previous line would be nicer but keep it simple
-            _step("Jira comments...", f"OK ({len(jira_comments)} comments)")
-        except Exception as e:
-            _step("Jira comments...", f"ERROR: {e}")
-    else:
-        _step("Jira tickets...", "skipped (no Jira refs in cases)")
+            _step(label, f"{n} found")
+        for c in rows[:max_cases]:
+            print(f"    [#{c.get('CaseNumber', '')}] {c.get('Subject', '')}", flush=True)
+    elif step == "emails":
+        _step(label, f"{n} found")
+        for em in rows:
+            print(f"    {_date_str(em.get('MessageDate'))}  {em.get('Subject', '')}", flush=True)
+    elif step == "comments":
+        _step(label, f"OK ({n})")
+    elif step == "jira_issues":
+        _step(label, f"OK ({n} issues)")
+    elif step == "jira_comments":
+        _step(label, f"OK ({n} comments)")
+    elif step in ("sync_trials", "cloud_trials"):
+        _step(label, f"Available ({n} rows)" if n > 0 else "Not available")
+    elif step == "gong_calls":
+        _step(label, f"{n} found" if n > 0 else "None found")
+        for call in rows:
+            primary = " [Primary]" if call.get("IsPrimaryOpportunity") else ""
+            print(f"    {_date_str(call.get('Gong__Call_Start__c'))}  {call.get('Name', '')}{primary}", flush=True)
 
-    # Sync trials
-    sync_trials = []
-    try:
-        sync_trials = collector.get_sync_trials(opp["Id"])
-        n = len(sync_trials)
-        _step("Sync trials...", f"Available ({n} rows)" if n > 0 else "Not available")
-    except Exception as e:
-        _step("Sync trials...", f"ERROR: {e}")
 
-    # Cloud trials
-    cloud_trials = []
-    try:
-        cloud_trials = collector.get_cloud_trials(opp["Id"])
-        n = len(cloud_trials)
-        _step("Connect Cloud trials...", f"Available ({n} rows)" if n > 0 else "Not available")
-    except Exception as e:
-        _step("Connect Cloud trials...", f"ERROR: {e}")
+def _gather_and_display(opp: dict, collector, config: dict, mode: str) -> dict:
+    print(f"\nGathering data for: {opp.get('Name', opp.get('Id', ''))}")
+    max_cases = config.get("max_cases_per_opp", 10)
 
-    # Gong calls
-    gong_calls = []
-    try:
-        gong_calls = collector.get_gong_calls(opp["Id"])
-        n = len(gong_calls)
-        _step("Gong calls...", f"{n} found" if n > 0 else "None found")
-        for call in gong_calls:
-            call_date = call.get("Gong__Call_Start__c", "")
-            date_str = call_date.date().isoformat() if hasattr(call_date, "date") else str(call_date)[:10]
-            primary = " [Primary]" if call.get("IsPrimaryOpportunity") else ""
-            print(f"    {date_str}  {call.get('Name', '')}{primary}", flush=True)
-    except Exception as e:
-        _step("Gong calls...", f"ERROR: {e}")
-
-    return {
-        "opp": opp,
-        "opp_type": _get_opp_type(opp),
-        "products": products,
-        "cases": cases,
-        "total_cases_found": total_cases,
-        "emails": emails,
-        "comments": comments,
-        "jira_issues": jira_issues,
-        "jira_comments": jira_comments,
-        "sync_trials": sync_trials,
-        "cloud_trials": cloud_trials,
-        "gong_calls": gong_calls,
-        "errors": [],
-    }
+    # Steps finish in any order, each one is shown as it completes
+    data = collector.collect_all(
+        opp, progress=lambda step, rows, error: _show_step(step, rows, error, max_cases))
+    data["opp_type"] = _get_opp_type(opp)
+    # Errors were already shown next to their step
+    data["errors"] = []
+    return data
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Analyze Salesforce opportunities with Claude.")
+    parser.add_argument("--refresh", action="store_true",
+                        help="call Claude even when a cached analysis of the same data exists")
+    args = parser.parse_args()
+
     # Load config
     try:
         config = _load_config()
@@ -307,7 +258,14 @@ def main():
             print("\nCalling Claude for analysis...", flush=True)
             banner = "=" * 70
             try:
-                analysis = analyzer.analyze(data)
+                hits = analyzer.cache.hits if analyzer.cache else 0
+                analysis = analyzer.analyze(data, refresh=args.refresh)
+                if analyzer.cache and analyzer.cache.hits > hits:
+                    print("Data unchanged since the last analysis, showing the cached one (--refresh to re-run).")
+                cut = [f"{section.replace('_', ' ')} {c['dropped']} dropped, {c['truncated']} shortened"
+                       for section, c in analyzer.last_prompt_report.items() if c["dropped"] or c["truncated"]]
+                if cut:
+                    print(f"Prompt budget: {'; '.join(cut)}")
                 print(f"\n{banner}")
                 print(f"ANALYSIS: {selected_opp.get('Name', '')}")
                 print(banner)
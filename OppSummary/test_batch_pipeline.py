@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the batch pipeline.
+Runs BatchPipeline with a fake collector and a stub Claude client, without Salesforce, Jira or the API.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+from analyzer import Analyzer
+from batch_pipeline import BatchPipeline, StubClient, output_file_name
+
+
+class FakeCollector:
+    """Serves canned opportunity data and records the connections reserved for collection."""
+
+    def __init__(self, fail_ids=()):
+        self.fail_ids = set(fail_ids)
+        self.reserved = []
+
+    def reserve_connections(self, count):
+        self.reserved.append(count)
+
+    def collect_all(self, opp):
+        if opp["Id"] in self.fail_ids:
+            raise RuntimeError("Salesforce unavailable")
+        return {"opp": opp, "errors": []}
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class RateLimitedClient(StubClient):
+    """StubClient that answers the first call for each prompt with a retryable 429."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._seen = set()
+        self.calls = 0
+
+    def create(self, model, max_tokens, messages):
+        prompt = messages[0]["content"]
+        with self._lock:
+            self.calls += 1
+            limited = prompt not in self._seen
+            self._seen.add(prompt)
+        if limited:
+            raise RateLimitError("rate limited")
+        return super().create(model, max_tokens, messages)
+
+
+def test_batch_pipeline():
+    """Test queueing, retry on rate limits and the output files."""
+    print("Testing BatchPipeline...")
+
+    try:
+        opps = [{"Id": f"006{i:03d}", "Name": f"Deal {i}", "StageName": "Open"} for i in range(6)]
+        config = {"claude_model": "stub", "batch_collect_workers": 2, "max_concurrent_queries": 3,
+                  "batch_queue_size": 1, "batch_max_retries": 3, "batch_retry_base_seconds": 0.001}
+        collector = FakeCollector(fail_ids={"006005"})
+        client = RateLimitedClient()
+        analyzer = Analyzer(config, client=client)
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            pipeline = BatchPipeline(collector, analyzer, config, out_dir, concurrency=2)
+            ok = pipeline.run(opps)
+
+            if ok or pipeline.failed != ["006005"]:
+                print(f"✗ Expected only the collection of 006005 to fail, got {pipeline.failed}")
+                return False
+            print("✓ A failed collection is recorded and the batch goes on")
+
+            expected = sorted(os.path.join(out_dir, output_file_name(opp)) for opp in opps[:5])
+            if sorted(pipeline.written) != expected or sorted(os.listdir(out_dir)) != sorted(map(os.path.basename, expected)):
+                print(f"✗ Unexpected output files: {sorted(os.listdir(out_dir))}")
+                return False
+            with open(expected[0]) as f:
+                text = f.read()
+            if "# Deal 0" not in text or "[stub analysis from stub" not in text:
+                print("✗ Output file is missing the header or the analysis")
+                return False
+            print("✓ Each analysis is written to its own file")
+
+        # Every analysis was rate limited once before it succeeded
+        if client.calls != 10:
+            print(f"✗ Expected 10 Claude calls with retries, got {client.calls}")
+            return False
+        print("✓ Rate-limited calls are retried")
+
+        if collector.reserved != [2 * 3]:
+            print(f"✗ Expected 6 connections reserved, got {collector.reserved}")
+            return False
+        print("✓ Connections are reserved for every query of every collection worker")
+        return True
+
+    except Exception as e:
+        print(f"✗ BatchPipeline test failed: {e}")
+        return False
+
+
+def main():
+    tests = [
+        test_batch_pipeline,
+    ]
+
+    passed = 0
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test script for DataCollector's local store sync.
+Runs _sync_stored against a fake execute and a temporary LocalStore, without Salesforce or Jira.
+"""
+
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from data_collector import STORE_CLOCK_MARGIN, DataCollector
+from local_store import LocalStore
+
+
+class FakeSource:
+    """Answers email queries from a fixed list of rows, honouring the IN clause and the since filter."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def execute(self, sql):
+        self.queries.append(sql)
+        ids = set(re.findall(r"'([^']*)'", sql.split("IN", 1)[1].split(")", 1)[0]))
+        since = re.search(r">= '([^']*)'", sql)
+        return [row for row in self.rows if row["ParentId"] in ids
+                and (since is None or row["LastModifiedDate"] >= since.group(1))]
+
+
+def build_emails_sql(ids, since):
+    return f"SELECT em.[Id], em.[ParentId], em.[LastModifiedDate] FROM [EmailMessage] em WHERE em.[ParentId] IN {ids}{since}"
+
+
+def make_collector(store):
+    """DataCollector over a store only, without the Salesforce and Jira connections."""
+    collector = DataCollector.__new__(DataCollector)
+    collector._config = {}
+    collector._store = store
+    return collector
+
+
+def test_sync_stored():
+    """Test that every synced parent's mark moves up, so the next delta query starts recently."""
+    print("Testing DataCollector._sync_stored...")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = LocalStore(os.path.join(tmp, "store.db"))
+            collector = make_collector(store)
+            # Case 500A's last email is two years old, 500B has none at all
+            source = FakeSource([{"Id": "02s1", "ParentId": "500A", "LastModifiedDate": "2024-10-01T00:00:00"}])
+            start = datetime.now(timezone.utc)
+
+            first = collector._sync_stored("emails", source.execute, build_emails_sql, ["500A", "500B"])
+            if [row["Id"] for row in first] != ["02s1"] or ">=" in source.queries[0]:
+                print(f"✗ The first sync should pull new parents in full, got {first}")
+                return False
+            print("✓ New parents are pulled in full")
+
+            marks = store.high_water_marks("emails", ["500A", "500B"])
+            floor = (start - STORE_CLOCK_MARGIN - timedelta(seconds=1)).isoformat(timespec="seconds")
+            if not all(mark >= floor for mark in marks.values()):
+                print(f"✗ Marks stayed at the last modified row: {marks}")
+                return False
+
+            second = collector._sync_stored("emails", source.execute, build_emails_sql, ["500A", "500B"])
+            since = re.search(r">= '([^']*)'", source.queries[-1])
+            if since is None or since.group(1) < floor or [row["Id"] for row in second] != ["02s1"]:
+                print(f"✗ The second sync queried since {since and since.group(1)}, expected {floor} or later")
+                return False
+            print("✓ The next delta query starts at the last sync, not the oldest row")
+
+            # A row modified after the sync start keeps its newer stamp as the mark
+            future = (datetime.now(timezone.utc) + timedelta(hours=2)).isoformat(timespec="seconds")
+            source.rows.append({"Id": "02s2", "ParentId": "500B", "LastModifiedDate": future})
+            collector._sync_stored("emails", source.execute, build_emails_sql, ["500B"])
+            if store.high_water_marks("emails", ["500B"])["500B"] != future:
+                print("✗ A row newer than the sync start did not set the mark")
+                return False
+            print("✓ Newer row stamps still move the mark further")
+            store.close()
+        return True
+
+    except Exception as e:
+        print(f"✗ _sync_stored test failed: {e}")
+        return False
+
+
+def main():
+    tests = [
+        test_sync_stored,
+    ]
+
+    passed = 0
+    for test in tests:
+        if test():
+            passed += 1
+        print()
+
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,7 @@ Handles database connections using CData Python libraries
 import json
 import os
 import re
+import threading
 from typing import Dict, Any, Optional
 import importlib
 
@@ -31,6 +32,12 @@ class ConnectionManager:
         
         self.selected_connection = None
         self.connection = None
+        self.pool = None
+        # Callers on several threads may ask for the pool at once, only one may create it
+        self._pool_lock = threading.Lock()
+        self.metadata_cache = None
+        self.statement_caches = {}
+        self.result_cache = None
         self.config = self.json_obj.get('config', {})
     
     def get_connection(self):
@@ -45,10 +52,120 @@ class ConnectionManager:
     
     def close_connection(self):
         """Close the current connection."""
+        self.close_pool()
+        self.close_metadata_cache()
+        self.close_statement_caches()
         if self.connection:
             self.connection.close()
             self.connection = None
     
+    def get_pool(self, max_size: Optional[int] = None):
+        """Get the connection pool for the selected connection, creating it on first use.
+        
+        The pool hands out physical connections separate from self.connection so that
+        concurrent callers never share one. Sizes come from the poolmin, poolmax and
+        poolidletimeout config settings; max_size grows the pool for callers that need more.
+        """
+        if self.selected_connection is None or self.connection is None:
+            raise Exception("No connection has been selected. Select a valid connection before executing SQL queries.")
+        
+        with self._pool_lock:
+            if self.pool is None:
+                from connection_pool import ConnectionPool
+                conn_cfg = self.selected_connection
+                pool = ConnectionPool(lambda: self.open_connection(conn_cfg),
+                                      min_size=self.get_config_int('poolmin', 1),
+                                      max_size=self.get_config_int('poolmax', 5),
+                                      idle_timeout=self.get_config_int('poolidletimeout', 300))
+                # Open the poolmin connections up front so the first callers don't wait for them
+                pool.fill()
+                self.pool = pool
+            pool = self.pool
+        if max_size is not None:
+            pool.resize(max_size)
+        return pool
+    
+    def close_pool(self):
+        """Close the connection pool if one was created."""
+        with self._pool_lock:
+            pool, self.pool = self.pool, None
+        if pool:
+            pool.close()
+    
+    def get_metadata_cache(self):
+        """Get the local metadata catalog of the selected connection, or None if caching is off.
+        
+        The catalog is a SQLite file <name>.metadata.db in logdir (in memory without a logdir).
+        Entries expire after metadatattl seconds (default one day); 0 disables the cache.
+        """
+        if self.selected_connection is None:
+            return None
+        
+        ttl = self.get_config_int('metadatattl', 86400)
+        if ttl <= 0:
+            return None
+        
+        if self.metadata_cache is None:
+            from metadata_cache import MetaDataCache
+            log_dir = self.config.get('logdir')
+            if log_dir and os.path.isdir(log_dir):
+                db_path = os.path.join(log_dir, f"{self.selected_connection['name']}.metadata.db")
+            else:
+                db_path = ':memory:'
+            self.metadata_cache = MetaDataCache(db_path, ttl)
+        self.metadata_cache.ttl = ttl
+        return self.metadata_cache
+    
+    def close_metadata_cache(self):
+        """Close the metadata catalog if one was opened."""
+        if self.metadata_cache:
+            self.metadata_cache.close()
+            self.metadata_cache = None
+    
+    def get_statement_cache(self, connection):
+        """Get the prepared statement cache of a connection, or None if stmtcachesize is 0."""
+        capacity = self.get_config_int('stmtcachesize', 20)
+        if capacity <= 0:
+            return None
+        
+        cache = self.statement_caches.get(id(connection))
+        if cache is None or cache.connection is not connection:
+            from statement_cache import StatementCache
+            cache = StatementCache(connection, capacity)
+            self.statement_caches[id(connection)] = cache
+        cache.capacity = capacity
+        return cache
+    
+    def close_statement_caches(self):
+        """Close the cached statements of all connections."""
+        for cache in self.statement_caches.values():
+            cache.close()
+        self.statement_caches = {}
+    
+    def get_result_cache_ttl(self) -> int:
+        """TTL in seconds of cached SELECT results for the selected connection, 0 when caching is off.
+        
+        A cachettl entry on the connection in connections.json wins over the resultcachettl config setting.
+        """
+        if self.selected_connection is None:
+            return 0
+        ttl = self.selected_connection.get('cachettl')
+        if ttl is None:
+            return self.get_config_int('resultcachettl', 0)
+        try:
+            return int(ttl)
+        except (TypeError, ValueError):
+            return 0
+    
+    def get_result_cache(self):
+        """Get the session's SELECT result cache, shared by all connections."""
+        if self.result_cache is None:
+            from result_cache import ResultCache
+            max_bytes = self.get_config_int('resultcachemb', 64) * 1024 * 1024
+            max_disk_bytes = self.get_config_int('resultcachediskmb', 256) * 1024 * 1024
+            self.result_cache = ResultCache(max_bytes, self.config.get('resultcachedir') or None, max_disk_bytes)
+        return self.result_cache
+    
     def parse_jdbc_connection_string(self, jdbc_string: str) -> Dict[str, str]:
         """Parse JDBC connection string and convert to Python connector properties."""
         properties = {}
@@ -92,38 +209,29 @@ class ConnectionManager:
         except ImportError as e:
             raise ImportError(f"Could not import {module_name}: {e}")
     
+    def get_connection_config(self, connection_name: str) -> Optional[Dict[str, Any]]:
+        """Find a connection entry of connections.json by name."""
+        for conn in self.json_obj['connections']:
+            if conn['name'] == connection_name:
+                return conn
+        return None
+    
     def select_connection(self, connection_name: str, show_details: bool = True) -> bool:
         """Select and establish a connection to the specified database."""
         # Find the connection configuration
-        self.selected_connection = None
-        for conn in self.json_obj['connections']:
-            if conn['name'] == connection_name:
-                self.selected_connection = conn
-                break
+        self.selected_connection = self.get_connection_config(connection_name)
         
         if self.selected_connection is None:
             print(f"The selected connection {connection_name} does not exist.")
             return False
         
+        # The pool, metadata catalog and statements belong to the previously selected connection
+        self.close_pool()
+        self.close_metadata_cache()
+        self.close_statement_caches()
+        
         try:
-            # Parse JDBC connection string into individual properties
-            jdbc_props = self.parse_jdbc_connection_string(self.selected_connection['connection'])
-            
-            # Get Python connector module
-            connector_module = self.get_python_connector_class(self.selected_connection['driver'])
-            
-            # For CData Python connectors, we need to pass the connection string directly
-            # Remove the 'jdbc:' prefix and the database type prefix
-            connection_string = self.selected_connection['connection']
-            if connection_string.startswith('jdbc:'):
-                connection_string = connection_string[5:]
-            
-            # Remove the database type prefix (e.g., 'salesforce:', 'jira:', etc.)
-            if ':' in connection_string:
-                connection_string = connection_string.split(':', 1)[1]
-            
-            # Create connection with the cleaned connection string
-            self.connection = connector_module.connect(connection_string)
+            self.connection = self.open_connection(self.selected_connection)
             
             if show_details:
                 print(self.show_database_info())
@@ -138,10 +246,55 @@ class ConnectionManager:
             self.connection = None
             return False
     
+    def open_connection(self, conn_cfg: Dict[str, Any]):
+        """Open a new physical connection for a connection entry from connections.json."""
+        # Parse JDBC connection string into individual properties
+        jdbc_props = self.parse_jdbc_connection_string(conn_cfg['connection'])
+        
+        # Get Python connector module
+        connector_module = self.get_python_connector_class(conn_cfg['driver'])
+        
+        # For CData Python connectors, we need to pass the connection string directly
+        # Remove the 'jdbc:' prefix and the database type prefix
+        connection_string = conn_cfg['connection']
+        if connection_string.startswith('jdbc:'):
+            connection_string = connection_string[5:]
+        
+        # Remove the database type prefix (e.g., 'salesforce:', 'jira:', etc.)
+        if ':' in connection_string:
+            connection_string = connection_string.split(':', 1)[1]
+        
+        # Create connection with the cleaned connection string
+        return connector_module.connect(connection_string)
+    
+    def get_paramstyle(self) -> str:
+        """Get the DB-API paramstyle of the selected connector, qmark if it doesn't say."""
+        if self.selected_connection is None:
+            return 'qmark'
+        try:
+            module = self.get_python_connector_class(self.selected_connection['driver'])
+            return getattr(module, 'paramstyle', 'qmark')
+        except (ImportError, ValueError):
+            return 'qmark'
+    
     def is_debug_enabled(self) -> bool:
         """Check if debug mode is enabled in the configuration."""
         return self.config.get('debug', False)
-    
+
+    def get_config_bool(self, name: str, default: bool = False) -> bool:
+        """Read a boolean config setting. Values set with the config command arrive as strings."""
+        value = self.config.get(name, default)
+        if isinstance(value, str):
+            return value.strip().lower() in ('true', 'yes', 'on', '1')
+        return bool(value)
+
+    def get_config_int(self, name: str, default: int = 0) -> int:
+        """Read an integer config setting, falling back to the default on bad values."""
+        try:
+            return int(self.config.get(name, default))
+        except (TypeError, ValueError):
+            return default
+
     def show_database_info(self, connection=None) -> str:
         """Show database connection information."""
         if connection is None:
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+ConnectionPool - Pool of physical connections for concurrent callers
+Each checkout hands out a connection that no other thread is using
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+
+
+class ConnectionPool:
+    HEALTH_CHECK_QUERY = "SELECT Product FROM sys_information"
+
+    def __init__(self, connect: Callable, min_size: int = 1, max_size: int = 5,
+                 idle_timeout: float = 300, validate_after: float = 30, checkout_timeout: float = 60):
+        """Initialize the pool with a factory that opens a new physical connection.
+
+        Args:
+            connect: Callable that returns a new connection
+            min_size: Idle connections kept open even after the idle timeout
+            max_size: Maximum number of physical connections open at once
+            idle_timeout: Seconds after which surplus idle connections are closed
+            validate_after: Idle seconds after which a connection is health-checked on checkout
+            checkout_timeout: Seconds to wait for a free connection before giving up
+        """
+        self._connect = connect
+        self.min_size = max(int(min_size), 0)
+        self.max_size = max(int(max_size), 1, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.validate_after = validate_after
+        self.checkout_timeout = checkout_timeout
+        self._idle: List[Tuple[object, float]] = []
+        self._in_use = set()
+        self._opening = 0
+        self._lock = threading.Condition()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of physical connections currently open."""
+        with self._lock:
+            return len(self._idle) + len(self._in_use) + self._opening
+
+    def fill(self):
+        """Open connections until the minimum size is reached."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + len(self._in_use) + self._opening >= self.min_size:
+                    return
+                self._opening += 1
+            conn = None
+            try:
+                conn = self._connect()
+            finally:
+                with self._lock:
+                    self._opening -= 1
+                    if conn is not None:
+                        self._idle.append((conn, time.time()))
+                    self._lock.notify()
+
+    def resize(self, max_size: int):
+        """Grow the maximum size, e.g. to give every worker thread its own connection."""
+        with self._lock:
+            self.max_size = max(self.max_size, int(max_size))
+            self._lock.notify_all()
+
+    def is_healthy(self, conn) -> bool:
+        """Run the health-check query against sys_information."""
+        try:
+            cursor = conn.cursor()
+            cursor.execute(self.HEALTH_CHECK_QUERY)
+            cursor.fetchall()
+            cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def checkout(self):
+        """Take a connection out of the pool, opening a new one if none is idle."""
+        deadline = time.time() + self.checkout_timeout
+        while True:
+            conn, idle_since, opening = None, None, False
+            with self._lock:
+                if self._closed:
+                    raise Exception("The connection pool has been closed.")
+                expired = self._reap_idle()
+                if self._idle:
+                    conn, idle_since = self._idle.pop()
+                    self._in_use.add(id(conn))
+                elif len(self._in_use) + self._opening < self.max_size:
+                    # Reserve the slot before connecting outside the lock
+                    self._opening += 1
+                    opening = True
+                elif not expired:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise Exception(f"Timed out waiting for a free connection, all {self.max_size} are in use.")
+                    self._lock.wait(remaining)
+                    continue
+
+            # Closing may wait on the server, so expired connections are closed outside the lock
+            for stale in expired:
+                self._close_quietly(stale)
+
+            if opening:
+                try:
+                    conn = self._connect()
+                finally:
+                    with self._lock:
+                        self._opening -= 1
+                        if conn is not None:
+                            self._in_use.add(id(conn))
+                        self._lock.notify()
+                return conn
+
+            if conn is None:
+                continue
+
+            if time.time() - idle_since < self.validate_after or self.is_healthy(conn):
+                return conn
+
+            # Stale connection, drop it and try again
+            self._discard(conn)
+
+    def checkin(self, conn):
+        """Return a connection to the pool."""
+        with self._lock:
+            self._in_use.discard(id(conn))
+            closed = self._closed
+            if not closed:
+                self._idle.append((conn, time.time()))
+            self._lock.notify()
+        if closed:
+            self._close_quietly(conn)
+
+    def _discard(self, conn):
+        """Close a checked out connection and free its slot."""
+        with self._lock:
+            self._in_use.discard(id(conn))
+            self._lock.notify()
+        self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with block."""
+        conn = self.checkout()
+        try:
+            yield conn
+        except Exception:
+            # The connection may be in an unknown state, don't hand it to the next caller
+            if self.is_healthy(conn):
+                self.checkin(conn)
+            else:
+                self._discard(conn)
+            raise
+        else:
+            self.checkin(conn)
+
+    def _reap_idle(self) -> list:
+        """Remove idle connections beyond the minimum size that exceeded the idle timeout. Caller holds the lock.
+
+        Returns the removed connections for the caller to close once it has released the lock.
+        """
+        now = time.time()
+        keep = []
+        expired = []
+        # Most recently used connections are at the end of the list
+        for conn, idle_since in reversed(self._idle):
+            if now - idle_since > self.idle_timeout and len(keep) + len(self._in_use) >= self.min_size:
+                expired.append(conn)
+            else:
+                keep.append((conn, idle_since))
+        keep.reverse()
+        self._idle = keep
+        return expired
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close all idle connections. Connections still checked out are closed on checkin."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._lock.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
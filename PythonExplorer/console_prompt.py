@@ -7,12 +7,41 @@ Main entry point for the JDBCExplorer application
 import argparse
 import sys
 import time
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 from connection_manager import ConnectionManager
-from sql_command import SQLCommand
-from metadata_helper import MetaDataHelper
-from performance_test import PerformanceTest
+
+# SQLCommand, MetaDataHelper and PerformanceTest pull in pandas and tabulate, they are
+# imported by the commands that use them so the prompt comes up without loading them
+
+
+# Statements that may span several lines in a script, up to a line ending in ';'
+MULTILINE_COMMANDS = ['select', 'with', 'insert', 'update', 'delete', 'cache', 'replicate', 'export']
+
+# --format option to displayformat
+OUTPUT_FORMATS = {'table': 'grid', 'csv': 'csv', 'jsonl': 'jsonl'}
+
+
+def split_script(lines: Iterable[str]) -> Iterator[str]:
+    """Split script lines into commands.
+    
+    SQL statements run until a line ending in ';', other commands (use, config, show ...)
+    take one line. Blank lines and -- comments are skipped.
+    """
+    pending = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('--'):
+            continue
+        if not pending and line.split()[0].lower() not in MULTILINE_COMMANDS:
+            yield line
+            continue
+        pending.append(line)
+        if line.endswith(';'):
+            yield ' '.join(pending)
+            pending = []
+    if pending:
+        yield ' '.join(pending)
 
 
 class ConsolePrompt:
@@ -21,6 +50,8 @@ class ConsolePrompt:
         self.conn_manager = None
         self.sql_prompt = "sql >"
         self.current_prompt = self.sql_prompt
+        self.interactive = True
+        self.failed = False
     
     def parse_arguments(self):
         """Parse command line arguments."""
@@ -29,9 +60,31 @@ class ConsolePrompt:
                           help='The connections file. If none is specified connections.json is read.')
         parser.add_argument('-c', '--connection', 
                           help='The name of the connection in the connections file.')
+        parser.add_argument('-e', '--execute', action='append', metavar='COMMAND',
+                          help='Run a command or SQL statement and exit. Can be given more than once.')
+        parser.add_argument('-s', '--script',
+                          help='Run the commands in a script file and exit. Commands are also read from stdin when it is not a terminal.')
+        parser.add_argument('--format', choices=list(OUTPUT_FORMATS), default='table',
+                          help='Output format of query results in script mode.')
+        parser.add_argument('--stop-on-error', action='store_true',
+                          help='In script mode, stop at the first failing command.')
         
         return parser.parse_args()
     
+    def page_size(self):
+        """Rows per page of query results, script mode shows everything without paging."""
+        return self.conn_manager.config.get('pagesize', 100) if self.interactive else -1
+    
+    def sql_command(self, query: str):
+        """Create an SQLCommand for the query on the selected connection."""
+        from sql_command import SQLCommand
+        return SQLCommand(self.conn_manager.get_connection(), query, self.page_size(), self.conn_manager)
+    
+    def metadata_helper(self):
+        """Create a MetaDataHelper for the selected connection."""
+        from metadata_helper import MetaDataHelper
+        return MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager)
+    
     def show_help(self):
         """Display help information."""
         print("The following commands are supported:")
@@ -43,10 +96,20 @@ class ConsolePrompt:
         print("keys [table];           Lists the primary keys in the table.")
         print("fkeys [table];          Lists the foreign keys in the table.")
         print("describe [table];       Lists the columns in the table.")
-        print("show tablestats;        Show the row count and column names for each table.")
-        print("start batch;            Start a batch command to insert/update/delete.")
+        print("show tablestats [pattern] [parallel [file]];")
+        print("                        Show the row count and column names for each table. With parallel the")
+        print("                        tables are counted concurrently without paging, optionally into a CSV/JSON file.")
+        print("start batch [file|-];   Start a batch command to insert/update/delete. With a CSV/JSONL file, or - to")
+        print("                        type rows, a parameterized statement is run for every row with executemany.")
         print("performance;            Start a performance test.")
-        print("write metadata;         Write metadata in CSV files Tables.csv and Columns.csv.")
+        print("export [file] [select]; Stream the result of a SELECT into a .parquet, .arrow/.feather, .csv or .csv.gz file.")
+        print("fanout [conn1,conn2,...] [select];")
+        print("                        Run the SELECT on the named connections in parallel and combine the results.")
+        print("write metadata [full];  Write metadata in CSV files Tables.csv and Columns.csv. Resumes an interrupted")
+        print("                        export and skips unchanged tables, unless full is given.")
+        print("refresh metadata [table];")
+        print("                        Refetch cached metadata for the table, or for all tables.")
+        print("cache stats|clear;      Show statistics of the query result cache, or empty it.")
         print("help;                   This help.")
         print("config {name} {value}   Change a config setting read from the connections.json.")
         print("exit;                   Exits this program.")
@@ -55,12 +118,16 @@ class ConsolePrompt:
         print("Notes:")
         print("1) For parameterized statements, use :name as the parameter placeholder.")
         print("   For example: INSERT into Account (Name,City) values (:name,:city)")
-        print("2) Parameters are not allowed in batch commands.")
+        print("   Values are sent as bind parameters. Numbers, dates and NULL are typed; quote a value to keep it text.")
+        print("2) Parameters are not allowed in batch commands, except in start batch with a file.")
+        print("3) Use 'config streaming true' to page through large results without fetching them all first.")
+        print("4) Press Ctrl-C to cancel a running SELECT. Use 'config querytimeout N' and 'config rowlimit N' to bound queries.")
+        print("5) Run with -e \"<sql>\", -s script.sql or piped stdin for non-interactive script mode, see --help.")
     
-    def process_command(self, command: str):
-        """Process a single command."""
+    def process_command(self, command: str) -> bool:
+        """Process a single command and return whether it succeeded."""
         if not command or command.strip() == "":
-            return
+            return True
         
         # Remove trailing semicolon
         if command.endswith(';'):
@@ -71,33 +138,65 @@ class ConsolePrompt:
         command_original = command.split()  # Keep original case for case-sensitive databases
         
         if not command_parts:
-            return
+            return True
         
+        success = True
         try:
             # SELECT queries
             if (self.conn_manager.has_valid_connection() and 
                 command_parts[0] == "select"):
-                cmd = SQLCommand(self.conn_manager.get_connection(), command, 
-                               self.conn_manager.config.get('pagesize', 100), self.conn_manager)
-                cmd.run_select()
+                cmd = self.sql_command(command)
+                success = cmd.run_select()
+            
+            # Query result cache commands, other CACHE statements go to the driver
+            elif (len(command_parts) == 2 and command_parts[0] == "cache" and
+                  command_parts[1] in ["stats", "clear"]):
+                result_cache = self.conn_manager.get_result_cache()
+                if command_parts[1] == "clear":
+                    result_cache.clear()
+                    print("Query cache cleared.")
+                else:
+                    for name, value in result_cache.stats().items():
+                        print(f"{name:<15}: {value}")
+            
+            # Export a SELECT into a file: export <file> <select>
+            elif (self.conn_manager.has_valid_connection() and 
+                  command_parts[0] == "export" and len(command_parts) > 2 and command_parts[2] == "select"):
+                _, filename, query = command.split(None, 2)
+                cmd = self.sql_command(query)
+                success = cmd.run_export(filename)
+            
+            # Run a SELECT on several connections at once: fanout <conn1,conn2,...> <select>
+            elif (command_parts[0] == "fanout" and len(command_parts) > 2 and command_parts[2] == "select"):
+                from fanout_query import FanoutQuery
+                _, names, query = command.split(None, 2)
+                fanout = FanoutQuery(self.conn_manager, [name for name in names.split(',') if name], query,
+                                     self.page_size(), self.conn_manager.config.get('displayformat', 'grid'))
+                success = fanout.run()
             
             # INSERT, UPDATE, DELETE, CACHE, REPLICATE commands
             elif (self.conn_manager.has_valid_connection() and 
                   command_parts[0] in ["insert", "update", "delete", "cache", "replicate"]):
-                cmd = SQLCommand(self.conn_manager.get_connection(), command, 
-                               self.conn_manager.config.get('pagesize', 100), self.conn_manager)
-                cmd.run_command(is_insert=(command_parts[0] == "insert"))
+                cmd = self.sql_command(command)
+                success = cmd.run_command(is_insert=(command_parts[0] == "insert"))
             
             # Batch commands
             elif (self.conn_manager.has_valid_connection() and 
                   len(command_parts) >= 2 and command_parts[0] == "start" and command_parts[1] == "batch"):
-                cmd = SQLCommand(self.conn_manager.get_connection(), command, 
-                               self.conn_manager.config.get('pagesize', 100), self.conn_manager)
-                cmd.run_batch()
+                cmd = self.sql_command(command)
+                if len(command_original) > 2:
+                    # start batch <file|-> loads rows through a parameterized statement
+                    success = cmd.run_bulk_batch(command_original[2])
+                else:
+                    success = cmd.run_batch()
             
             # Performance testing
             elif (self.conn_manager.has_valid_connection() and 
                   command_parts[0] in ["perf", "performance"]):
+                if not self.interactive:
+                    print("The performance test prompts for its settings and can't run in script mode.")
+                    return False
+                from performance_test import PerformanceTest, parse_fetch_strategy, run_fetch_sweep
                 pquery = input("Query: ")
                 runs_input = input("Runs Default(3): ")
                 runs = int(runs_input) if runs_input.strip() else 3
@@ -105,43 +204,69 @@ class ConsolePrompt:
                 threads = int(threads_input) if threads_input.strip() else 1
                 rint_input = input("Row Progress Interval Default(25000): ")
                 rint = int(rint_input) if rint_input.strip() else 25000
+                fetch_input = input("Fetch Strategy Default(fetchone) [fetchone/fetchmany(N)/fetchall/iterate/sweep]: ").strip()
                 
-                performance = PerformanceTest(self.conn_manager, pquery, runs, threads, rint)
-                performance.run_test()
-                performance.show_results()
+                if fetch_input.lower() == "sweep":
+                    sizes = self.conn_manager.config.get('sweepsizes', '100,1000,5000,10000')
+                    array_sizes = [int(size) for size in str(sizes).split(',') if size.strip()]
+                    run_fetch_sweep(self.conn_manager, pquery, runs, threads, rint, array_sizes)
+                else:
+                    strategy, array_size = parse_fetch_strategy(fetch_input or 'fetchone',
+                                                                self.conn_manager.get_config_int('arraysize', 1000))
+                    performance = PerformanceTest(self.conn_manager, pquery, runs, threads, rint, strategy, array_size)
+                    performance.run_test()
+                    performance.show_results()
             
             # Show tables
             elif (self.conn_manager.has_valid_connection() and 
                   len(command_parts) >= 2 and command_parts[0] == "show" and command_parts[1] == "tables"):
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).show_tables()
+                success = self.metadata_helper().show_tables()
             
             # Write metadata
             elif (self.conn_manager.has_valid_connection() and 
                   len(command_parts) >= 2 and command_parts[0] == "write" and command_parts[1] == "metadata"):
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).write_metadata_to_file()
+                full = len(command_parts) > 2 and command_parts[2] == "full"
+                success = self.metadata_helper().write_metadata_to_file(full)
+            
+            # Refresh cached metadata
+            elif (self.conn_manager.has_valid_connection() and 
+                  len(command_parts) >= 2 and command_parts[0] == "refresh" and command_parts[1] == "metadata"):
+                table_name = command_original[2] if len(command_original) > 2 else None
+                success = self.metadata_helper().refresh_metadata(table_name)
             
             # Describe table
             elif (self.conn_manager.has_valid_connection() and 
                   command_parts[0].startswith("desc") and len(command_original) > 1):
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).show_columns(command_original[1])
+                success = self.metadata_helper().show_columns(command_original[1])
             
             # Show table stats
             elif (self.conn_manager.has_valid_connection() and 
                   len(command_parts) >= 2 and command_parts[0] == "show" and command_parts[1].startswith("tablestats")):
-                table_pattern = '%'
-                if len(command_parts) > 2:
-                    table_pattern = command_parts[2]
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).show_table_stats(table_pattern)
+                # show tablestats [pattern] [parallel [file]]
+                args = command_original[2:]
+                lower_args = [arg.lower() for arg in args]
+                parallel = "parallel" in lower_args
+                if parallel:
+                    position = lower_args.index("parallel")
+                    output_file = args[position + 1] if len(args) > position + 1 else None
+                    args = args[:position]
+                table_pattern = args[0] if args else '%'
+                helper = self.metadata_helper()
+                if parallel:
+                    workers = self.conn_manager.get_config_int('tablestatsthreads', 8)
+                    success = helper.collect_table_stats(table_pattern, workers, output_file)
+                else:
+                    success = helper.show_table_stats(table_pattern)
             
             # Show keys
             elif (self.conn_manager.has_valid_connection() and 
                   command_parts[0].startswith("keys") and len(command_original) > 1):
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).show_keys(command_original[1])
+                success = self.metadata_helper().show_keys(command_original[1])
             
             # Show foreign keys
             elif (self.conn_manager.has_valid_connection() and 
                   command_parts[0].startswith("fkeys") and len(command_original) > 1):
-                MetaDataHelper(self.conn_manager.get_connection(), self.conn_manager).show_imported_keys(command_original[1])
+                success = self.metadata_helper().show_imported_keys(command_original[1])
             
             # Show databases
             elif len(command_parts) >= 2 and command_parts[0] == "show" and command_parts[1] == "databases":
@@ -149,7 +274,8 @@ class ConsolePrompt:
             
             # Use database
             elif command_parts[0] == "use" and len(command_original) > 1:
-                if self.conn_manager.select_connection(command_original[1]):
+                success = self.conn_manager.select_connection(command_original[1], show_details=self.interactive)
+                if success:
                     self.current_prompt = f"{self.conn_manager.selected_connection['name']} >"
             
             # Config command
@@ -160,8 +286,9 @@ class ConsolePrompt:
             # Exit commands
             elif command_parts[0] in ["q", "exit", "quit"]:
                 self.conn_manager.close_connection()
-                print("Goodbye!")
-                sys.exit(0)
+                if self.interactive:
+                    print("Goodbye!")
+                sys.exit(1 if self.failed else 0)
             
             # Close connection
             elif command_parts[0] == "close":
@@ -178,10 +305,14 @@ class ConsolePrompt:
             
             else:
                 print(f"Unsupported command: [{command}]. You must select a database before running database commands.")
+                success = False
         
         except Exception as ex:
             print(f"Error: {ex}")
             print("")
+            success = False
+        
+        return success
     
     def run(self):
         """Run the main application loop."""
@@ -196,6 +327,10 @@ class ConsolePrompt:
             print(f"Error initializing connection manager: {e}")
             sys.exit(1)
         
+        commands = self.script_commands(args)
+        if commands is not None:
+            sys.exit(self.run_script(args, commands))
+        
         # Auto-connect if specified
         if args.connection:
             self.process_command(f"use {args.connection}")
@@ -221,6 +356,42 @@ class ConsolePrompt:
         finally:
             if self.conn_manager:
                 self.conn_manager.close_connection()
+    
+    def script_commands(self, args) -> Optional[Iterable[str]]:
+        """Get the commands of a non-interactive run, or None to start the prompt."""
+        if args.execute:
+            return args.execute
+        if args.script:
+            with open(args.script) as f:
+                return list(split_script(f))
+        if not sys.stdin.isatty():
+            # Read lazily so batch and parameter prompts can consume the lines that follow
+            return split_script(iter(sys.stdin.readline, ''))
+        return None
+    
+    def run_script(self, args, commands: Iterable[str]) -> int:
+        """Run commands without paging or prompts and return the exit code."""
+        self.interactive = False
+        config = self.conn_manager.config
+        config['interactive'] = 'false'
+        if args.format != 'table' or 'displayformat' not in config:
+            config['displayformat'] = OUTPUT_FORMATS[args.format]
+        
+        try:
+            if args.connection and not self.process_command(f"use {args.connection}"):
+                return 1
+            
+            for command in commands:
+                if not self.process_command(command):
+                    self.failed = True
+                    if args.stop_on_error:
+                        break
+        except KeyboardInterrupt:
+            return 130
+        finally:
+            self.conn_manager.close_connection()
+        
+        return 1 if self.failed else 0
 
 
 def main():
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+FanoutQuery - Runs one SELECT against several connections at once
+Each connection is opened and queried on its own thread; its rows are shown as soon as it finishes,
+or combined into one table for the data formats
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from page_renderer import PageRenderer
+from result_set_helper import ResultSetHelper
+
+# Column added to the combined result with the name of the connection each row came from,
+# suffixed with _1, _2, ... when a connection's result already has a column of that name
+CONNECTION_COLUMN = 'connection'
+
+
+class FanoutQuery:
+    def __init__(self, connection_manager, connection_names: List[str], query: str,
+                 page_size: int = 100, display_format: str = 'grid'):
+        """Initialize with the connections from connections.json to query and the SELECT to run."""
+        self.connection_manager = connection_manager
+        self.connection_names = connection_names
+        self.query = query
+        self.page_size = page_size
+        self.display_format = display_format
+        self.results: List[Dict[str, Any]] = []
+        self.connection_column = CONNECTION_COLUMN
+
+    def _run_one(self, conn_cfg: Dict[str, Any]) -> Dict[str, Any]:
+        """Open a new connection, run the query and return its rows with timings."""
+        result = {'name': conn_cfg['name'], 'df': None, 'connect_time': 0.0, 'query_time': 0.0, 'error': None}
+        start_time = time.time()
+        connection = None
+        try:
+            connection = self.connection_manager.open_connection(conn_cfg)
+            result['connect_time'] = time.time() - start_time
+
+            query_start = time.time()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.query)
+                rows = cursor.fetchall()
+                columns = [desc[0] for desc in cursor.description]
+            finally:
+                cursor.close()
+            result['df'] = pd.DataFrame(rows, columns=columns)
+            result['query_time'] = time.time() - query_start
+        except Exception as e:
+            result['error'] = str(e)
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        return result
+
+    @staticmethod
+    def _connection_column(columns) -> str:
+        """Name of the source column: connection, or connection_1, _2, ... if the result already has one."""
+        column, suffix = CONNECTION_COLUMN, 0
+        while column in columns:
+            suffix += 1
+            column = f"{CONNECTION_COLUMN}_{suffix}"
+        return column
+
+    def _show(self, df: pd.DataFrame, column: str):
+        """Display rows tagged with their connection, keeping the connection as the first displayed column."""
+        helper = ResultSetHelper(df)
+        cols = None
+        if not PageRenderer.is_data_format(self.display_format):
+            picked = helper.pick_columns()
+            picked.pop(column, None)
+            cols = {column: helper.column_widths[column]}
+            cols.update(list(picked.items())[:4])
+        helper.show_results(cols, page_size=self.page_size, display_format=self.display_format)
+
+    def run(self) -> bool:
+        """Query all connections in parallel and report each as it finishes.
+
+        For the display formats each connection's rows are shown as soon as it finishes, so the
+        fastest source comes first. The data formats write one combined table once all are done.
+        """
+        if not self.connection_names:
+            print("No connections given, use fanout <conn1,conn2,...> <select>.")
+            return False
+        configs = []
+        for name in self.connection_names:
+            conn_cfg = self.connection_manager.get_connection_config(name)
+            if conn_cfg is None:
+                print(f"The selected connection {name} does not exist.")
+                return False
+            configs.append(conn_cfg)
+
+        data_format = PageRenderer.is_data_format(self.display_format)
+        status = sys.stderr if data_format else sys.stdout
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=len(configs)) as executor:
+            futures = [executor.submit(self._run_one, conn_cfg) for conn_cfg in configs]
+            for future in as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                if result['error']:
+                    print(f"{result['name']:<15}: failed after {time.time() - start_time:.3f}s: {result['error']}",
+                          file=status)
+                else:
+                    print(f"{result['name']:<15}: {len(result['df'])} rows, connect {result['connect_time']:.3f}s, "
+                          f"query {result['query_time']:.3f}s", file=status)
+                    if not data_format and not result['df'].empty:
+                        # The other connections keep running while these rows are paged through
+                        column = self._connection_column(result['df'].columns)
+                        df = result['df'].copy()
+                        df.insert(0, column, result['name'])
+                        self._show(df, column)
+
+        if data_format:
+            combined = self.combined_result()
+            if combined is not None:
+                self._show(combined, self.connection_column)
+
+        print(f"Total Time: {time.time() - start_time:.3f} seconds", file=status)
+        return all(result['error'] is None for result in self.results)
+
+    def combined_result(self) -> Optional[pd.DataFrame]:
+        """Concatenate the successful results in connection order, tagging each row with its connection."""
+        order = {name: position for position, name in enumerate(self.connection_names)}
+        results = [result for result in sorted(self.results, key=lambda r: order[r['name']])
+                   if result['df'] is not None]
+        if not results:
+            return None
+        
+        # Never overwrite a result column that happens to be called connection
+        column = self._connection_column(set().union(*(result['df'].columns for result in results)))
+        self.connection_column = column
+        
+        frames = []
+        for result in results:
+            frame = result['df'].copy()
+            frame.insert(0, column, result['name'])
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True, sort=False)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+MetaDataCache - Local SQLite catalog of database metadata
+Serves SYS_TABLES, SYS_TABLECOLUMNS, SYS_PRIMARYKEYS and SYS_FOREIGNKEYS results without a network round trip
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+
+class MetaDataCache:
+    # Kind of metadata for the table listing, which isn't tied to one table
+    ALL_TABLES = ''
+
+    def __init__(self, db_path: str, ttl: int = 86400):
+        """Open (or create) the cache database. Entries older than ttl seconds are refetched."""
+        self.db_path = db_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                kind TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                columns TEXT NOT NULL,
+                rows TEXT NOT NULL,
+                PRIMARY KEY (kind, table_name)
+            )
+        """)
+        self._db.commit()
+
+    def get(self, kind: str, table_name: str = ALL_TABLES) -> Optional[Tuple[List[str], List[tuple]]]:
+        """Return (columns, rows) for a cached query, or None if it is missing or expired."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, columns, rows FROM metadata WHERE kind = ? AND table_name = ?",
+                (kind, table_name.lower())).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return None
+        return json.loads(row[1]), [tuple(r) for r in json.loads(row[2])]
+
+    def put(self, kind: str, table_name: str, columns: List[str], rows: List[tuple]):
+        """Store the result of a metadata query."""
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO metadata (kind, table_name, fetched_at, columns, rows) VALUES (?, ?, ?, ?, ?)",
+                (kind, table_name.lower(), time.time(), json.dumps(columns), json.dumps([list(r) for r in rows], default=str)))
+            self._db.commit()
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Drop cached metadata for one table, or everything when no table is given."""
+        with self._lock:
+            if table_name is None:
+                self._db.execute("DELETE FROM metadata")
+            else:
+                self._db.execute("DELETE FROM metadata WHERE table_name = ?", (table_name.lower(),))
+            self._db.commit()
+
+    def close(self):
+        """Close the cache database."""
+        with self._lock:
+            self._db.close()
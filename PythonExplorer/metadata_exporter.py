@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+MetadataExporter - Resumable export of table and column metadata to CSV files
+Columns are read in one scan ordered by table and written one table at a time into their own file,
+with a checkpoint so an interrupted export keeps the tables it finished
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from typing import Any, Dict, List
+
+TABLES_HEADER = ['TABLE_CAT', 'TABLE_SCHEM', 'TABLE_NAME']
+COLUMNS_HEADER = ['TABLE_NAME', 'COLUMN_NAME', 'DATA_TYPE', 'COLUMN_SIZE']
+
+ALL_COLUMNS_QUERY = """
+            SELECT
+                TABLENAME as TABLE_NAME,
+                COLUMNNAME as COLUMN_NAME,
+                DATATYPENAME as DATA_TYPE,
+                LENGTH as COLUMN_SIZE
+            FROM SYS_TABLECOLUMNS
+            ORDER BY TABLENAME
+            """
+
+
+class MetadataExporter:
+    CHECKPOINT_FILE = 'checkpoint.jsonl'
+
+    def __init__(self, connection, output_dir: str = '.', fetch_size: int = 1000, progress_interval: int = 100):
+        """Initialize with a connection and the directory for Tables.csv, Columns.csv and the per-table files."""
+        self.connection = connection
+        self.output_dir = output_dir
+        self.parts_dir = os.path.join(output_dir, 'metadata_columns')
+        self.checkpoint_path = os.path.join(self.parts_dir, self.CHECKPOINT_FILE)
+        self.fetch_size = fetch_size
+        self.progress_interval = progress_interval
+        self.exported = 0
+        self.skipped = 0
+        self.failed: List[str] = []
+
+    @staticmethod
+    def signature(row: Dict[str, Any], columns: str = '') -> str:
+        """Signature of a SYS_TABLES row and the digest of its columns, a table is exported again when either changes."""
+        return hashlib.sha1(json.dumps([row, columns], sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def part_file_name(table_name: str) -> str:
+        """File name of a table's columns, safe for any table name and unique per table."""
+        safe = re.sub(r'[^\w.-]', '_', table_name)[:80]
+        return f"{safe}.{hashlib.sha1(table_name.encode('utf-8')).hexdigest()[:8]}.csv"
+
+    def load_checkpoint(self) -> Dict[str, Dict[str, Any]]:
+        """Tables completed by earlier runs, the last entry of a table wins."""
+        completed = {}
+        if not os.path.exists(self.checkpoint_path):
+            return completed
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A line cut short by an interrupted run
+                    continue
+                completed[entry['table']] = entry
+        return completed
+
+    def _get_tables(self) -> List[Dict[str, Any]]:
+        """All SYS_TABLES rows as dictionaries, ordered by table name."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute("SELECT * FROM SYS_TABLES ORDER BY TABLENAME")
+            columns = [desc[0] for desc in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+        return sorted(rows, key=lambda row: str(row['TABLENAME']))
+
+    def _write_tables(self, tables: List[Dict[str, Any]]):
+        path = os.path.join(self.output_dir, 'Tables.csv')
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(TABLES_HEADER)
+            for row in tables:
+                writer.writerow([row.get('CATALOGNAME'), row.get('SCHEMANAME'), row['TABLENAME']])
+
+    def _table_columns(self):
+        """Yield (table name, column rows) per table from one SYS_TABLECOLUMNS scan ordered by table.
+
+        Only the rows of the table being read are held in memory.
+        """
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(ALL_COLUMNS_QUERY)
+            current, rows = None, []
+            while True:
+                chunk = cursor.fetchmany(self.fetch_size)
+                if not chunk:
+                    break
+                for row in chunk:
+                    table_name = str(row[0])
+                    if table_name != current:
+                        if current is not None:
+                            yield current, rows
+                        current, rows = table_name, []
+                    rows.append(tuple(row))
+            if current is not None:
+                yield current, rows
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def column_digest(rows: List[tuple]) -> str:
+        """Digest of a table's SYS_TABLECOLUMNS rows."""
+        return hashlib.sha1(json.dumps([list(row) for row in rows], default=str).encode('utf-8')).hexdigest()
+
+    def _save_table(self, checkpoint, completed: Dict[str, Dict[str, Any]], row: Dict[str, Any], columns: List[tuple]):
+        """Write a table's part file unless it is unchanged since the checkpointed export."""
+        table_name = str(row['TABLENAME'])
+        signature = self.signature(row, self.column_digest(columns))
+        part_file = self.part_file_name(table_name)
+        part_path = os.path.join(self.parts_dir, part_file)
+
+        previous = completed.get(table_name)
+        if previous and previous['signature'] == signature and os.path.exists(part_path):
+            self.skipped += 1
+            return
+        try:
+            with open(part_path + '.tmp', 'w', newline='') as f:
+                csv.writer(f).writerows(columns)
+            # Only a completely written file replaces the previous one
+            os.replace(part_path + '.tmp', part_path)
+            self._checkpoint(checkpoint, table_name, signature, part_file, len(columns))
+            self.exported += 1
+        except Exception as e:
+            print(f"Could not export columns of {table_name}: {e}")
+            self.failed.append(table_name)
+
+    def _checkpoint(self, f, table_name: str, signature: str, part_file: str, columns: int):
+        f.write(json.dumps({'table': table_name, 'signature': signature, 'file': part_file,
+                            'columns': columns, 'exported_at': time.time()}) + '\n')
+        f.flush()
+
+    def export(self, full: bool = False) -> bool:
+        """Export Tables.csv, the per-table column files and Columns.csv.
+
+        The columns of all tables come from one SYS_TABLECOLUMNS scan ordered by table. Each
+        table is written and checkpointed as its rows are complete; a table whose SYS_TABLES row
+        and column rows are unchanged since the last export keeps its file, unless full is set.
+        Returns False if any table failed, a re-run picks it up.
+        """
+        start_time = time.time()
+        if full and os.path.isdir(self.parts_dir):
+            shutil.rmtree(self.parts_dir)
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+        tables = self._get_tables()
+        self._write_tables(tables)
+        print(f"Written Tables.csv with {len(tables)} tables, now writing column information.")
+
+        by_name = {str(row['TABLENAME']): row for row in tables}
+        completed = self.load_checkpoint()
+        done = set()
+        with open(self.checkpoint_path, 'a') as checkpoint:
+            try:
+                for table_name, columns in self._table_columns():
+                    if table_name not in by_name or table_name in done:
+                        continue
+                    self._save_table(checkpoint, completed, by_name[table_name], columns)
+                    done.add(table_name)
+                    if self.progress_interval and len(done) % self.progress_interval == 0:
+                        print(f"Tables: {len(done)}/{len(tables)} Exported: {self.exported} "
+                              f"Unchanged: {self.skipped} Failed: {len(self.failed)}")
+                # Tables without any columns get an empty file
+                for table_name, row in by_name.items():
+                    if table_name not in done:
+                        self._save_table(checkpoint, completed, row, [])
+            except Exception as e:
+                # The finished tables are checkpointed, the others keep their previous files
+                missing = [name for name in by_name if name not in done]
+                print(f"Could not read the columns of {len(missing)} tables: {e}")
+                self.failed.extend(missing)
+
+        self._compact_checkpoint({str(row['TABLENAME']) for row in tables})
+        self._remove_dropped_tables({self.part_file_name(str(row['TABLENAME'])) for row in tables})
+        rows = self._write_columns(tables)
+        print(f"Written Columns.csv with {rows} columns in {time.time() - start_time:.1f}s: "
+              f"{self.exported} tables exported, {self.skipped} unchanged, {len(self.failed)} failed")
+        return not self.failed
+
+    def _compact_checkpoint(self, current_tables: set):
+        """Rewrite the checkpoint with one entry per existing table."""
+        entries = [entry for table, entry in self.load_checkpoint().items() if table in current_tables]
+        with open(self.checkpoint_path + '.tmp', 'w') as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + '\n')
+        os.replace(self.checkpoint_path + '.tmp', self.checkpoint_path)
+
+    def _remove_dropped_tables(self, current_files: set):
+        """Delete the files of tables that no longer exist."""
+        for name in os.listdir(self.parts_dir):
+            if name.endswith('.csv') and name not in current_files:
+                os.remove(os.path.join(self.parts_dir, name))
+
+    def _write_columns(self, tables: List[Dict[str, Any]]) -> int:
+        """Concatenate the per-table files into Columns.csv, streaming one file at a time.
+
+        Returns the number of column records; a quoted value may span several lines.
+        """
+        rows = 0
+        path = os.path.join(self.output_dir, 'Columns.csv')
+        with open(path + '.tmp', 'w', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(COLUMNS_HEADER)
+            for row in tables:
+                part_path = os.path.join(self.parts_dir, self.part_file_name(str(row['TABLENAME'])))
+                if not os.path.exists(part_path):
+                    continue
+                with open(part_path, newline='') as part:
+                    for record in csv.reader(part):
+                        writer.writerow(record)
+                        rows += 1
+        os.replace(path + '.tmp', path)
+        return rows
@@ -4,17 +4,62 @@ MetaDataHelper - Python equivalent of MetaDataHelper.groovy
 Handles database metadata operations
 """
 
+import csv
+import json
+import re
+import time
 import pandas as pd
-from typing import List, Dict, Any
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
 from result_set_helper import ResultSetHelper
 
 
+def like_to_regex(pattern: str) -> str:
+    """Convert a SQL LIKE pattern into an equivalent regular expression."""
+    return ''.join('.*' if ch == '%' else '.' if ch == '_' else re.escape(ch) for ch in pattern)
+
+
+TABLES_QUERY = """
+            SELECT CATALOGNAME, SCHEMANAME, TABLENAME, DESCRIPTION
+            FROM SYS_TABLES 
+            """
+
+COLUMNS_QUERY = """
+            SELECT COLUMNNAME, DATATYPENAME, DISPLAYSIZE, LENGTH, ISNULLABLE
+            FROM SYS_TABLECOLUMNS 
+            WHERE TABLENAME = '{table_name}'
+            """
+
+
+@lru_cache(maxsize=64)
+def _row_type(columns: Tuple[str, ...]):
+    """namedtuple class for a result's columns, created once per distinct column list."""
+    return namedtuple('Row', columns, rename=True)
+
+
+def to_rows(columns: List[str], results: List[tuple]) -> List[tuple]:
+    """Wrap result rows in namedtuples so fields can be read by column name without building a DataFrame."""
+    row_type = _row_type(tuple(columns))
+    return [row_type._make(row) for row in results]
+
+
 class MetaDataHelper:
     def __init__(self, connection, connection_manager=None):
         """Initialize with a database connection and optional connection manager for debug settings."""
         self.connection = connection
         self.connection_manager = connection_manager
     
+    def _execute_query(self, query: str) -> Tuple[List[str], List[tuple]]:
+        """Execute a query and return the column names and rows."""
+        cursor = self.connection.cursor()
+        cursor.execute(query)
+        results = cursor.fetchall()
+        columns = [desc[0] for desc in cursor.description]
+        cursor.close()
+        return columns, results
+    
     def _execute_query_to_dataframe(self, query: str) -> pd.DataFrame:
         """Execute a query and return results as a DataFrame.
         
@@ -24,61 +69,132 @@ class MetaDataHelper:
         Returns:
             DataFrame containing the query results
         """
-        cursor = self.connection.cursor()
-        cursor.execute(query)
-        results = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(results, columns=columns)
-        cursor.close()
-        return df
+        columns, results = self._execute_query(query)
+        return pd.DataFrame(results, columns=columns)
     
-    def show_tables(self):
+    def _execute_query_to_rows(self, query: str) -> List[tuple]:
+        """Execute a query and return the rows as namedtuples with the result columns as fields."""
+        columns, results = self._execute_query(query)
+        return to_rows(columns, results)
+    
+    def _cached_query(self, kind: str, table_name: str, query: str) -> Tuple[List[str], List[tuple]]:
+        """Execute a metadata query through the local metadata catalog.
+        
+        The source is only queried when the catalog has no fresh entry for this kind of
+        metadata and table, so catalogs are populated lazily one table at a time.
+        
+        Args:
+            kind: Kind of metadata, e.g. columns or keys
+            table_name: Table the metadata belongs to, empty for the table listing
+            query: SQL query to run on a cache miss
+            
+        Returns:
+            The column names and rows of the query results
+        """
+        cache = self.connection_manager.get_metadata_cache() if self.connection_manager else None
+        if cache is not None:
+            cached = cache.get(kind, table_name)
+            if cached is not None:
+                return cached
+        
+        columns, results = self._execute_query(query)
+        if cache is not None:
+            cache.put(kind, table_name, columns, results)
+        return columns, results
+    
+    def _cached_query_to_rows(self, kind: str, table_name: str, query: str) -> List[tuple]:
+        """Execute a metadata query through the catalog and return namedtuple rows."""
+        return to_rows(*self._cached_query(kind, table_name, query))
+    
+    def _cached_query_to_dataframe(self, kind: str, table_name: str, query: str) -> pd.DataFrame:
+        """Execute a metadata query through the catalog and return a DataFrame for display."""
+        columns, results = self._cached_query(kind, table_name, query)
+        return pd.DataFrame(results, columns=columns)
+    
+    def _get_tables(self) -> List[tuple]:
+        """Get the table listing from SYS_TABLES as rows with CATALOGNAME, SCHEMANAME, TABLENAME and DESCRIPTION."""
+        return self._cached_query_to_rows('tables', '', TABLES_QUERY)
+    
+    def _get_tables_dataframe(self) -> pd.DataFrame:
+        """Get the table listing from SYS_TABLES for display."""
+        return self._cached_query_to_dataframe('tables', '', TABLES_QUERY)
+    
+    def _get_matching_tables(self, table_pattern: str) -> List[str]:
+        """Names of the tables in the (cached) table listing that match a LIKE pattern."""
+        regex = re.compile(like_to_regex(table_pattern), re.IGNORECASE)
+        return [row.TABLENAME for row in self._get_tables() if regex.fullmatch(str(row.TABLENAME))]
+    
+    def _get_columns(self, table_name: str) -> List[tuple]:
+        """Get the columns of a table from SYS_TABLECOLUMNS as rows with COLUMNNAME, DATATYPENAME, DISPLAYSIZE, LENGTH and ISNULLABLE."""
+        return self._cached_query_to_rows('columns', table_name, COLUMNS_QUERY.format(table_name=table_name))
+    
+    def _get_columns_dataframe(self, table_name: str) -> pd.DataFrame:
+        """Get the columns of a table from SYS_TABLECOLUMNS for display."""
+        return self._cached_query_to_dataframe('columns', table_name, COLUMNS_QUERY.format(table_name=table_name))
+    
+    def _is_interactive(self) -> bool:
+        """Check if results may pause for input, script mode turns this off."""
+        return self.connection_manager is None or self.connection_manager.get_config_bool('interactive', True)
+    
+    def _show_dataframe(self, df: pd.DataFrame):
+        """Display a metadata result, without paging in script mode."""
+        helper = ResultSetHelper(df)
+        if self.connection_manager is None:
+            helper.show_results()
+        else:
+            helper.show_results(page_size=200 if self._is_interactive() else -1,
+                                display_format=self.connection_manager.config.get('displayformat', 'grid'))
+    
+    def refresh_metadata(self, table_name: str = None) -> bool:
+        """Drop cached metadata so it is fetched again from the source on next use."""
+        cache = self.connection_manager.get_metadata_cache() if self.connection_manager else None
+        if cache is None:
+            print("The metadata cache is disabled (metadatattl is 0).")
+            return False
+        
+        cache.invalidate(table_name)
+        if table_name:
+            print(f"Metadata for {table_name} will be refreshed on next use.")
+        else:
+            print("All cached metadata will be refreshed on next use.")
+        return True
+    
+    def show_tables(self) -> bool:
         """Show all tables in the database."""
         try:
             # Get table information
-            query = """
-            SELECT CATALOGNAME, SCHEMANAME, TABLENAME, DESCRIPTION
-            FROM SYS_TABLES 
-            """
-            
-            # Execute query and convert to DataFrame
-            df = self._execute_query_to_dataframe(query)
+            df = self._get_tables_dataframe()
             
             # Display results
-            helper = ResultSetHelper(df)
-            helper.show_results()
+            self._show_dataframe(df)
+            return True
             
         except Exception as e:
             print(f"Error getting tables: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
     
-    def show_columns(self, table_name: str):
+    def show_columns(self, table_name: str) -> bool:
         """Show columns for a specific table."""
         print(f"Showing columns for {table_name}")
         
         try:
-            query = f"""
-            SELECT COLUMNNAME, DATATYPENAME, DISPLAYSIZE, LENGTH, ISNULLABLE
-            FROM SYS_TABLECOLUMNS 
-            WHERE TABLENAME = '{table_name}'
-            """
-            
-            # Execute query and convert to DataFrame
-            df = self._execute_query_to_dataframe(query)
+            df = self._get_columns_dataframe(table_name)
             
             # Display results
-            helper = ResultSetHelper(df)
-            helper.show_results()
+            self._show_dataframe(df)
+            return True
             
         except Exception as e:
             print(f"Error getting columns for {table_name}: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
     
-    def show_keys(self, table_name: str):
+    def show_keys(self, table_name: str) -> bool:
         """Show primary keys for a specific table."""
         try:
             query = f"""
@@ -88,21 +204,22 @@ class MetaDataHelper:
             """
             
             # Execute query and convert to DataFrame
-            df = self._execute_query_to_dataframe(query)
+            df = self._cached_query_to_dataframe('keys', table_name, query)
             
             if df.empty:
                 print(f"No primary keys found for table {table_name}")
             else:
-                helper = ResultSetHelper(df)
-                helper.show_results()
-                
+                self._show_dataframe(df)
+            return True
+            
         except Exception as e:
             print(f"Error getting primary keys for {table_name}: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
     
-    def show_imported_keys(self, table_name: str):
+    def show_imported_keys(self, table_name: str) -> bool:
         """Show foreign keys for a specific table."""
         try:
             query = f"""
@@ -112,64 +229,43 @@ class MetaDataHelper:
             """
             
             # Execute query and convert to DataFrame
-            df = self._execute_query_to_dataframe(query)
+            df = self._cached_query_to_dataframe('fkeys', table_name, query)
             
             if df.empty:
                 print(f"No foreign keys found for table {table_name}")
             else:
-                helper = ResultSetHelper(df)
-                helper.show_results()
-                
+                self._show_dataframe(df)
+            return True
+            
         except Exception as e:
             print(f"Error getting foreign keys for {table_name}: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
     
-    def show_table_stats(self, table_pattern: str = '%'):
+    def show_table_stats(self, table_pattern: str = '%') -> bool:
         """Show table statistics including row counts and column information."""
         try:
-            # Get all tables matching the pattern
-            query = f"""
-            SELECT TABLENAME 
-            FROM SYS_TABLES 
-            WHERE TABLENAME LIKE '{table_pattern}'
-            """
-            
-            # Execute query and convert to DataFrame
-            tables_df = self._execute_query_to_dataframe(query)
+            # Get all tables matching the pattern from the (cached) table listing
+            table_names = self._get_matching_tables(table_pattern)
             
             count = 0
-            for _, row in tables_df.iterrows():
-                table_name = row['TABLENAME']
+            for table_name in table_names:
                 count += 1
                 
                 print(f"\n\n{count}) {table_name}")
                 
                 try:
                     # Get column information
-                    cols_query = f"""
-                    SELECT COLUMNNAME, DATATYPENAME 
-                    FROM SYS_TABLECOLUMNS 
-                    WHERE TABLENAME = '{table_name}'
-                    """
-                    # Execute query and convert to DataFrame
-                    cols_df = self._execute_query_to_dataframe(cols_query)
+                    table_columns = self._get_columns(table_name)
                     
                     # Get row count
                     count_query = f"SELECT COUNT(*) as CNT FROM [{table_name}]"
-                    # Execute query and convert to DataFrame
-                    count_df = self._execute_query_to_dataframe(count_query)
-                    row_count = count_df.iloc[0]['CNT']
+                    row_count = self._execute_query_to_rows(count_query)[0].CNT
                     
                     print(f"{row_count} rows")
-                    print("Columns: ", end="")
-                    
-                    for _, col_row in cols_df.iterrows():
-                        col_name = col_row['COLUMNNAME']
-                        col_type = col_row['DATATYPENAME']
-                        print(f"{col_name} ({col_type}), ", end="")
-                    print()
+                    print("Columns: " + "".join(f"{col.COLUMNNAME} ({col.DATATYPENAME}), " for col in table_columns))
                     
                 except Exception as e:
                     print(f"Could not get metadata for table {table_name}: {e}")
@@ -178,55 +274,191 @@ class MetaDataHelper:
                         traceback.print_exc()
                 
                 # Ask if user wants to see more every 10 tables
-                if count % 10 == 0:
+                if count % 10 == 0 and self._is_interactive():
                     response = input("\n\nDo you want to see more tables [Y/N]? ").lower()
                     if response == 'n':
                         break
             
             print("\n")
+            return True
             
         except Exception as e:
             print(f"Error getting table statistics: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
     
-    def write_metadata_to_file(self):
-        """Write metadata to CSV files."""
-        try:
-            # Write table information
-            tables_query = """
-            SELECT 
-                CATALOGNAME as TABLE_CAT,
-                SCHEMANAME as TABLE_SCHEM,
-                TABLENAME as TABLE_NAME
-            FROM SYS_TABLES 
-            ORDER BY TABLENAME
-            """
-            
-            # Execute query and convert to DataFrame
-            tables_df = self._execute_query_to_dataframe(tables_query)
-            tables_df.to_csv('Tables.csv', index=False)
-            print("Written Tables.csv, now writing column information.")
-            
-            # Write column information
-            columns_query = """
-            SELECT 
-                TABLENAME as TABLE_NAME,
-                COLUMNNAME as COLUMN_NAME,
-                DATATYPENAME as DATA_TYPE,
-                LENGTH as COLUMN_SIZE
+    def _count_rows(self, table_name: str) -> int:
+        """Run SELECT COUNT(*) on a pooled connection of its own."""
+        count_query = f"SELECT COUNT(*) as CNT FROM [{table_name}]"
+        if self.connection_manager is None:
+            return self._execute_query(count_query)[1][0][0]
+        
+        with self.connection_manager.get_pool().connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(count_query)
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+    
+    def _get_all_columns(self, table_pattern: str) -> Dict[str, List[tuple]]:
+        """Get the columns of every table matching the pattern with a single SYS_TABLECOLUMNS query.
+        
+        The columns are also stored in the metadata catalog so later describe calls are local.
+        """
+        query = f"""
+            SELECT TABLENAME, COLUMNNAME, DATATYPENAME, DISPLAYSIZE, LENGTH, ISNULLABLE
             FROM SYS_TABLECOLUMNS 
-            ORDER BY TABLENAME
+            WHERE TABLENAME LIKE '{table_pattern}'
             """
+        columns, results = self._execute_query(query)
+        
+        by_table: Dict[str, List[tuple]] = {}
+        for row in results:
+            by_table.setdefault(str(row[0]).lower(), []).append(tuple(row[1:]))
+        
+        cache = self.connection_manager.get_metadata_cache() if self.connection_manager else None
+        if cache is not None:
+            for table_name, table_columns in by_table.items():
+                cache.put('columns', table_name, columns[1:], table_columns)
+        return by_table
+    
+    def collect_table_stats(self, table_pattern: str = '%', workers: int = 8, output_file: Optional[str] = None) -> bool:
+        """Collect table statistics concurrently without pausing for input.
+        
+        Column metadata comes from one SYS_TABLECOLUMNS query and the row counts are fanned
+        out over a bounded pool of connections. Results are printed as they complete and
+        can also be written to a CSV or JSON file.
+        """
+        writer = None
+        try:
+            if output_file:
+                # Reject an unknown extension before any query runs
+                TableStatsWriter.detect_format(output_file)
+            table_names = self._get_matching_tables(table_pattern)
+            print(f"Collecting statistics for {len(table_names)} tables with {workers} workers.")
             
-            # Execute query and convert to DataFrame
-            columns_df = self._execute_query_to_dataframe(columns_query)
-            columns_df.to_csv('Columns.csv', index=False)
-            print("Written Columns.csv")
+            columns_by_table = self._get_all_columns(table_pattern)
+            if output_file:
+                writer = TableStatsWriter(output_file)
+            
+            if self.connection_manager is not None:
+                self.connection_manager.get_pool(max_size=workers)
+            
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=workers if self.connection_manager else 1) as executor:
+                future_to_table = {executor.submit(self._timed_count, name): name for name in table_names}
+                
+                for count, future in enumerate(as_completed(future_to_table), 1):
+                    table_name = future_to_table[future]
+                    row_count, seconds, error = future.result()
+                    table_columns = columns_by_table.get(str(table_name).lower(), [])
+                    column_list = ", ".join(f"{col[0]} ({col[1]})" for col in table_columns)
+                    
+                    print(f"\n{count}) {table_name}")
+                    if error:
+                        print(f"Could not get row count for table {table_name}: {error}")
+                    else:
+                        print(f"{row_count} rows ({seconds:.2f}s)")
+                    print(f"Columns: {column_list}")
+                    
+                    if writer:
+                        writer.write({
+                            'table': table_name,
+                            'rows': row_count,
+                            'column_count': len(table_columns),
+                            'columns': column_list,
+                            'seconds': round(seconds, 3),
+                            'error': error
+                        })
+            
+            print(f"\nCollected statistics for {len(table_names)} tables in {time.time() - start_time:.1f}s")
+            if writer:
+                print(f"Statistics written to {output_file}")
+            return True
+            
+        except Exception as e:
+            print(f"Error getting table statistics: {e}")
+            if self.connection_manager and self.connection_manager.is_debug_enabled():
+                import traceback
+                traceback.print_exc()
+            return False
+        finally:
+            if writer:
+                writer.close()
+    
+    def _timed_count(self, table_name: str) -> Tuple[Optional[int], float, Optional[str]]:
+        """Count the rows of a table, returning (count, seconds, error)."""
+        start_time = time.time()
+        try:
+            return self._count_rows(table_name), time.time() - start_time, None
+        except Exception as e:
+            return None, time.time() - start_time, str(e)
+    
+    def write_metadata_to_file(self, full: bool = False) -> bool:
+        """Write metadata to CSV files.
+        
+        Columns are read in one scan and written one table at a time with a checkpoint, so a
+        re-run keeps the completed tables and rewrites only those whose metadata changed.
+        """
+        from metadata_exporter import MetadataExporter
+        
+        try:
+            output_dir = self.connection_manager.config.get('metadataexportdir', '.') if self.connection_manager else '.'
+            return MetadataExporter(self.connection, output_dir).export(full)
             
         except Exception as e:
             print(f"Error writing metadata to file: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
+
+
+class TableStatsWriter:
+    """Streams table statistics records to a CSV, JSON or JSON lines file as they arrive."""
+    
+    FIELDS = ['table', 'rows', 'column_count', 'columns', 'seconds', 'error']
+    FORMATS = [
+        ('.jsonl', 'jsonl'),
+        ('.json', 'json'),
+        ('.csv', 'csv'),
+    ]
+    
+    def __init__(self, filename: str):
+        """Open the output file, the format is picked from the extension."""
+        self.format = self.detect_format(filename)
+        self.file = open(filename, 'w', newline='')
+        self.count = 0
+        if self.format == 'csv':
+            self.csv_writer = csv.DictWriter(self.file, fieldnames=self.FIELDS)
+            self.csv_writer.writeheader()
+        elif self.format == 'json':
+            self.file.write("[")
+    
+    @classmethod
+    def detect_format(cls, filename: str) -> str:
+        """Get the output format from the file extension."""
+        for extension, file_format in cls.FORMATS:
+            if filename.lower().endswith(extension):
+                return file_format
+        raise ValueError(f"Unsupported statistics file {filename}. Use .csv, .json or .jsonl.")
+    
+    def write(self, record: Dict[str, Any]):
+        """Write one record and flush it so partial results survive an interrupted run."""
+        if self.format == 'csv':
+            self.csv_writer.writerow(record)
+        elif self.format == 'jsonl':
+            self.file.write(json.dumps(record, default=str) + "\n")
+        else:
+            self.file.write(("," if self.count else "") + "\n  " + json.dumps(record, default=str))
+        self.count += 1
+        self.file.flush()
+    
+    def close(self):
+        """Finish and close the file."""
+        if self.format == 'json':
+            self.file.write("\n]\n")
+        self.file.close()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+PageRenderer - Fast fixed-width rendering of result pages
+Cells are formatted column by column with vectorized string operations and each page is written with a single call
+"""
+
+import csv
+import io
+import sys
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+class PageRenderer:
+    # grid: bordered table, plain: aligned columns without borders,
+    # tsv/csv/jsonl: data for piping, tabulate: the original tabulate grid
+    FORMATS = ['grid', 'plain', 'tsv', 'csv', 'jsonl', 'tabulate']
+    DATA_FORMATS = ['tsv', 'csv', 'jsonl']
+
+    def __init__(self, widths: Dict[str, int], display_format: str = 'grid', out=None):
+        """Initialize with the display width of each column, as computed by ResultSetHelper.pick_columns."""
+        display_format = (display_format or 'grid').lower()
+        if display_format not in self.FORMATS:
+            raise ValueError(f"Unknown display format {display_format}. Use one of: {', '.join(self.FORMATS)}")
+        self.widths = widths
+        self.display_format = display_format
+        self.out = out
+        self._header_written = False
+
+    @classmethod
+    def is_data_format(cls, display_format: Optional[str]) -> bool:
+        """Check if the format writes plain data, without titles or truncation."""
+        return (display_format or '').lower() in cls.DATA_FORMATS
+
+    @staticmethod
+    def _cell_text(series: pd.Series) -> pd.Series:
+        """Convert a column to single-line strings, NULLs become empty cells."""
+        text = series.astype(object).where(series.notna(), '').astype(str)
+        if series.dtype == object:
+            text = text.str.replace(r'[\t\r\n]', ' ', regex=True)
+        return text
+
+    @staticmethod
+    def _fit(text: pd.Series, width: int, right: bool) -> pd.Series:
+        """Truncate cells longer than width with '...' and pad the rest to width."""
+        too_long = text.str.len() > width
+        if too_long.any():
+            text = text.copy()
+            if width > 3:
+                text[too_long] = text[too_long].str.slice(0, width - 3) + '...'
+            else:
+                text[too_long] = text[too_long].str.slice(0, width)
+        return text.str.rjust(width) if right else text.str.ljust(width)
+
+    def _columns(self, page_df: pd.DataFrame) -> List[str]:
+        return [col for col in self.widths if col in page_df.columns]
+
+    def render(self, page_df: pd.DataFrame) -> str:
+        """Render a page to text."""
+        columns = self._columns(page_df)
+
+        if self.display_format == 'tabulate':
+            from tabulate import tabulate
+            return tabulate(page_df[columns], headers='keys', tablefmt='grid', showindex=False) + '\n'
+
+        if self.display_format == 'csv':
+            buffer = io.StringIO()
+            page_df[columns].to_csv(buffer, index=False, header=not self._header_written,
+                                    quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+            return buffer.getvalue()
+
+        if self.display_format == 'jsonl':
+            if not len(page_df):
+                return ''
+            return page_df[columns].to_json(orient='records', lines=True, date_format='iso',
+                                            default_handler=str).rstrip('\n') + '\n'
+
+        if self.display_format == 'tsv':
+            lines = []
+            if not self._header_written:
+                lines.append('\t'.join(str(col) for col in columns))
+            if len(page_df):
+                row_text = self._cell_text(page_df[columns[0]]).values
+                for col in columns[1:]:
+                    row_text = row_text + '\t' + self._cell_text(page_df[col]).values
+                lines.extend(row_text.tolist())
+            return '\n'.join(lines) + '\n' if lines else ''
+
+        headers = []
+        cells = []
+        for col in columns:
+            series = page_df[col]
+            text = self._cell_text(series)
+            numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+            width = max(int(self.widths[col]), 1)
+            if numeric and len(text):
+                # Never cut digits off numbers
+                width = max(width, int(text.str.len().max()))
+            header = str(col)[:width] if len(str(col)) > width else str(col)
+            headers.append(header.rjust(width) if numeric else header.ljust(width))
+            cells.append(self._fit(text, width, numeric).values)
+
+        if self.display_format == 'plain':
+            sep, left, right = '  ', '', ''
+        else:
+            sep, left, right = ' | ', '| ', ' |'
+
+        rows = None
+        for column_cells in cells:
+            rows = column_cells if rows is None else rows + sep + column_cells
+        body = [left + line + right for line in rows.tolist()] if rows is not None else []
+        header_line = left + sep.join(headers) + right
+
+        if self.display_format == 'plain':
+            rule = sep.join('-' * len(h) for h in headers)
+            lines = [header_line, rule] + body
+        else:
+            rule = '+' + '+'.join('-' * (len(h) + 2) for h in headers) + '+'
+            lines = [rule, header_line, rule.replace('-', '=')] + body + [rule]
+        return '\n'.join(lines) + '\n'
+
+    def write_page(self, page_df: pd.DataFrame, title: Optional[str] = None):
+        """Render a page and write it, with its title, in one buffered write."""
+        text = self.render(page_df)
+        if title and not self.is_data_format(self.display_format):
+            text = f"\n{title}:\n" + text
+        self._header_written = True
+        out = self.out or sys.stdout
+        out.write(text)
+        out.flush()
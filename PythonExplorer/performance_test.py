@@ -4,22 +4,81 @@ PerformanceTest - Python equivalent of PerformanceTest.groovy
 Handles performance testing of queries
 """
 
+import csv
+import json
+import os
+import re
+import statistics
 import time
 import threading
-from typing import List, Dict, Any
-import pandas as pd
+from typing import List, Dict, Any, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from tabulate import tabulate
+
+# Estimate bytes from every Nth row so the measurement isn't dominated by sizing values
+BYTES_SAMPLE_INTERVAL = 100
+
+FETCH_STRATEGIES = ['fetchone', 'fetchmany', 'fetchall', 'iterate']
+DEFAULT_SWEEP_SIZES = [100, 1000, 5000, 10000]
+
+
+def parse_fetch_strategy(text: str, default_array_size: int = 1000):
+    """Parse 'fetchone', 'fetchall', 'iterate' or 'fetchmany(N)' into (strategy, array_size)."""
+    match = re.fullmatch(r'\s*(\w+)\s*(?:\(\s*(\d+)\s*\))?\s*', text or 'fetchone')
+    strategy = match.group(1).lower() if match else None
+    if strategy == 'iter':
+        strategy = 'iterate'
+    if strategy not in FETCH_STRATEGIES:
+        raise ValueError(f"Unknown fetch strategy: {text}. Use one of fetchone, fetchmany(N), fetchall, iterate.")
+    array_size = int(match.group(2)) if match.group(2) else default_array_size
+    return strategy, array_size
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct percentile of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def estimate_row_bytes(row) -> int:
+    """Rough payload size of a row: string/binary lengths, 8 bytes for other non-null values."""
+    size = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (str, bytes, bytearray)):
+            size += len(value)
+        else:
+            size += 8
+    return size
 
 
 class PerformanceTest:
-    def __init__(self, conn_manager, query: str, runs: int = 3, threads: int = 1, row_interval: int = 25000):
-        """Initialize performance test with connection manager, query, and test parameters."""
+    def __init__(self, conn_manager, query: str, runs: int = 3, threads: int = 1, row_interval: int = 25000,
+                 fetch_strategy: str = 'fetchone', array_size: int = 1000):
+        """Initialize performance test with connection manager, query, and test parameters.
+        
+        fetch_strategy is one of fetchone, fetchmany, fetchall or iterate; array_size is the
+        batch size for fetchmany and the cursor arraysize for the other strategies.
+        """
+        if fetch_strategy not in FETCH_STRATEGIES:
+            raise ValueError(f"Unknown fetch strategy: {fetch_strategy}")
         self.conn_manager = conn_manager
         self.query = query
         self.runs = runs
         self.threads = threads
         self.row_interval = row_interval
+        self.fetch_strategy = fetch_strategy
+        self.array_size = array_size
+        # The first warmupruns runs are reported separately from the steady state
+        self.warmup_runs = conn_manager.get_config_int('warmupruns', 1) if runs > 1 else 0
         self.results = []
+        self.pool = None
         self.test_run_time = None
         self.total_runtime = None
     
@@ -39,40 +98,97 @@ class PerformanceTest:
         tid = threading.current_thread().ident
         rows = 0
         cols = 0
+        first_row_time = None
+        intervals = []
+        sampled_bytes = 0
+        sampled_rows = 0
         
         print(f"\n*** Starting Run {run_num} Thread {tid} ***")
         
+        connection = None
         try:
+            # Each worker thread checks out its own physical connection from the pool
+            if self.pool is not None:
+                connection = self.pool.checkout()
+            else:
+                connection = self.conn_manager.get_connection()
+            
+            # Don't count the time spent opening a pooled connection
+            time_start = time.time()
+            last_interval_time = time_start
+            
             # Execute query and iterate through cursor for real-time progress reporting
-            connection = self.conn_manager.get_connection()
             cursor = connection.cursor()
             cursor.execute(self.query)
             
             # Get column count from cursor description
             cols = len(cursor.description)
             
-            # Iterate through results and report progress
-            while True:
-                row = cursor.fetchone()
-                if row is None:
-                    break
-                rows += 1  
-                # Report progress at intervals
-                if rows % self.row_interval == 0 or rows == 1:
-                    last_interval_time = self.write_interval_information(rows, tid, time_start, last_interval_time)
+            if self.fetch_strategy in ('fetchone', 'iterate'):
+                try:
+                    cursor.arraysize = self.array_size
+                except AttributeError:
+                    pass
+                row_source = iter(cursor.fetchone, None) if self.fetch_strategy == 'fetchone' else iter(cursor)
+                
+                # Iterate through results and report progress
+                for row in row_source:
+                    rows += 1  
+                    if rows % BYTES_SAMPLE_INTERVAL == 1:
+                        sampled_bytes += estimate_row_bytes(row)
+                        sampled_rows += 1
+                    # Report progress at intervals
+                    if rows % self.row_interval == 0 or rows == 1:
+                        previous_interval_time = last_interval_time
+                        last_interval_time = self.write_interval_information(rows, tid, time_start, last_interval_time)
+                        if rows == 1:
+                            first_row_time = last_interval_time - time_start
+                        else:
+                            intervals.append(last_interval_time - previous_interval_time)
+            else:
+                if self.fetch_strategy == 'fetchmany':
+                    batch_source = iter(lambda: cursor.fetchmany(self.array_size), [])
+                else:
+                    batch_source = iter([cursor.fetchall()])
+                
+                # Fetch batches and report progress whenever a batch crosses an interval boundary
+                for batch in batch_source:
+                    if not batch:
+                        break
+                    batch_start = rows
+                    rows += len(batch)
+                    for row in batch[(-batch_start) % BYTES_SAMPLE_INTERVAL::BYTES_SAMPLE_INTERVAL]:
+                        sampled_bytes += estimate_row_bytes(row)
+                        sampled_rows += 1
+                    if batch_start == 0 or rows // self.row_interval > batch_start // self.row_interval:
+                        previous_interval_time = last_interval_time
+                        last_interval_time = self.write_interval_information(rows, tid, time_start, last_interval_time)
+                        if batch_start == 0:
+                            first_row_time = last_interval_time - time_start
+                        else:
+                            intervals.append(last_interval_time - previous_interval_time)
             
             cursor.close()
             
-            # Final interval report
+            # Final interval report, the partial last interval isn't a latency sample
             last_interval_time = self.write_interval_information(rows, tid, time_start, last_interval_time)
             runtime = last_interval_time - time_start
             
             print(f"\n*** Run {run_num} Completed Thread {tid} *** Total Time: {runtime:.3f}s")
             
+            est_bytes = int(sampled_bytes / sampled_rows * rows) if sampled_rows else 0
             return {
+                'run': run_num,
+                'thread': tid,
+                'warmup': run_num <= self.warmup_runs,
                 'runtime': runtime,
+                'first_row_time': first_row_time if first_row_time is not None else runtime,
                 'rows': rows,
                 'cols': cols,
+                'bytes': est_bytes,
+                'rows_per_sec': rows / runtime if runtime > 0 else 0.0,
+                'bytes_per_sec': est_bytes / runtime if runtime > 0 else 0.0,
+                'intervals': intervals,
                 'success': True
             }
             
@@ -82,12 +198,18 @@ class PerformanceTest:
                 import traceback
                 traceback.print_exc()
             return {
+                'run': run_num,
+                'thread': tid,
+                'warmup': run_num <= self.warmup_runs,
                 'runtime': 0,
                 'rows': rows,
                 'cols': cols,
                 'success': False,
                 'error': str(ex)
             }
+        finally:
+            if self.pool is not None and connection is not None:
+                self.pool.checkin(connection)
     
     def run_test(self):
         """Run the performance test with multiple threads and runs."""
@@ -102,21 +224,134 @@ class PerformanceTest:
                 result = self.run_single_test(i)
                 self.results.append(result)
         else:
-            # Use thread pool for multi-threaded execution or when configured to do so
-            with ThreadPoolExecutor(max_workers=self.threads) as executor:
-                # Submit all test runs
-                future_to_run = {
-                    executor.submit(self.run_single_test, i): i 
-                    for i in range(1, self.runs + 1)
-                }
-                
-                # Collect results
-                for future in as_completed(future_to_run):
-                    result = future.result()
-                    self.results.append(result)
+            # Use thread pool for multi-threaded execution or when configured to do so.
+            # Give every worker its own connection so runs are really concurrent.
+            self.pool = self.conn_manager.get_pool(max_size=self.threads)
+            try:
+                with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                    # Submit all test runs
+                    future_to_run = {
+                        executor.submit(self.run_single_test, i): i 
+                        for i in range(1, self.runs + 1)
+                    }
+                    
+                    # Collect results
+                    for future in as_completed(future_to_run):
+                        result = future.result()
+                        self.results.append(result)
+            finally:
+                # Don't keep one connection per worker open once the run is over
+                self.conn_manager.close_pool()
+                self.pool = None
         
         self.total_runtime = time.time() - self.test_run_time
     
+    def describe_strategy(self) -> str:
+        """Readable name of the fetch strategy, e.g. fetchmany(1000)."""
+        if self.fetch_strategy == 'fetchmany':
+            return f"fetchmany({self.array_size})"
+        return self.fetch_strategy
+    
+    @staticmethod
+    def _stats(values: List[float]) -> Dict[str, float]:
+        """Percentiles, max, mean and standard deviation of a list of samples."""
+        return {
+            'count': len(values),
+            'p50': percentile(values, 50),
+            'p90': percentile(values, 90),
+            'p99': percentile(values, 99),
+            'max': max(values) if values else 0.0,
+            'mean': statistics.fmean(values) if values else 0.0,
+            'stdev': statistics.stdev(values) if len(values) > 1 else 0.0
+        }
+    
+    def _phase_summary(self, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Summarize a group of successful runs."""
+        return {
+            'runs': len(results),
+            'runtime': self._stats([r['runtime'] for r in results]),
+            'first_row_time': self._stats([r['first_row_time'] for r in results]),
+            'rows_per_sec': self._stats([r['rows_per_sec'] for r in results]),
+            'bytes_per_sec': self._stats([r['bytes_per_sec'] for r in results]),
+            'interval_latency': self._stats([t for r in results for t in r['intervals']])
+        }
+    
+    def summarize(self) -> Dict[str, Any]:
+        """Build the machine-readable result of the test across all runs and threads."""
+        successful = [r for r in self.results if r['success']]
+        selected = self.conn_manager.selected_connection or {}
+        summary = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.test_run_time)),
+            'connection': selected.get('name'),
+            'driver': selected.get('driver'),
+            'query': self.query,
+            'fetch_strategy': self.fetch_strategy,
+            'array_size': self.array_size,
+            'runs': self.runs,
+            'threads': self.threads,
+            'row_interval': self.row_interval,
+            'successful_runs': len(successful),
+            'failed_runs': len(self.results) - len(successful),
+            'total_runtime': self.total_runtime,
+            'overall': self._phase_summary(successful),
+            'warmup': self._phase_summary([r for r in successful if r['warmup']]),
+            'steady_state': self._phase_summary([r for r in successful if not r['warmup']]),
+            'results': self.results
+        }
+        return summary
+    
+    @staticmethod
+    def _format_stats_table(phase: Dict[str, Any]) -> str:
+        """Format the percentile table of one phase."""
+        def row(label, stats, scale=1.0, fmt="{:.0f}"):
+            return [label] + [fmt.format(stats[k] * scale) for k in ('p50', 'p90', 'p99', 'max', 'stdev')] + [stats['count']]
+        
+        rows = [
+            row("Runtime (ms)", phase['runtime'], 1000),
+            row("Time to first row (ms)", phase['first_row_time'], 1000),
+            row("Interval latency (ms)", phase['interval_latency'], 1000),
+            row("Rows/sec", phase['rows_per_sec']),
+            row("KB/sec (est.)", phase['bytes_per_sec'], 1 / 1024.0, "{:.1f}")
+        ]
+        return tabulate(rows, headers=["", "p50", "p90", "p99", "max", "stdev", "samples"], tablefmt='simple')
+    
+    def _log_file(self, extension: str) -> Optional[str]:
+        """Path of a log file next to <driver>.perf.txt, or None if no logdir is configured."""
+        log_dir = self.conn_manager.config.get('logdir')
+        if not log_dir or not os.path.exists(log_dir):
+            return None
+        return os.path.join(log_dir, f"{self.conn_manager.selected_connection['driver']}.perf.{extension}")
+    
+    def write_machine_readable(self, summary: Dict[str, Any]):
+        """Append the summary to <driver>.perf.json (one JSON document per line) and the runs to <driver>.perf.csv."""
+        json_file = self._log_file('json')
+        if json_file is None:
+            return
+        
+        with open(json_file, 'a') as f:
+            f.write(json.dumps(summary, default=str) + "\n")
+        
+        csv_file = self._log_file('csv')
+        fields = ['timestamp', 'connection', 'query', 'fetch_strategy', 'array_size', 'threads', 'run', 'thread', 'warmup', 'success',
+                  'runtime', 'first_row_time', 'rows', 'cols', 'bytes', 'rows_per_sec', 'bytes_per_sec',
+                  'interval_p50', 'interval_max', 'error']
+        write_header = not os.path.exists(csv_file)
+        with open(csv_file, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            if write_header:
+                writer.writeheader()
+            for result in self.results:
+                intervals = result.get('intervals', [])
+                writer.writerow(dict(result,
+                                     timestamp=summary['timestamp'],
+                                     connection=summary['connection'],
+                                     query=self.query,
+                                     fetch_strategy=self.fetch_strategy,
+                                     array_size=self.array_size,
+                                     threads=self.threads,
+                                     interval_p50=percentile(intervals, 50),
+                                     interval_max=max(intervals) if intervals else 0.0))
+    
     def show_results(self, append_to_file: bool = True):
         """Display performance test results."""
         success_count = 0
@@ -133,23 +368,71 @@ class PerformanceTest:
         
         if success_count > 0:
             avg_time = total_time / success_count
+            summary = self.summarize()
             
             perf_results = f"\n\n********* Performance Results: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.test_run_time))} **************\n"
             perf_results += self.conn_manager.show_database_info()
             perf_results += f"\nQuery: {self.query}, Rows: {rows}, Cols: {cols}"
-            perf_results += f"\nRuns: {self.runs} Threads: {self.threads}"
+            perf_results += f"\nRuns: {self.runs} Threads: {self.threads} Fetch: {self.describe_strategy()}"
             perf_results += f"\nAverage time: {avg_time*1000:.0f} ms ({avg_time:.3f}s) per thread."
             perf_results += f"\nTotal time taken for {self.runs} runs: {self.total_runtime*1000:.0f}ms ({self.total_runtime:.3f}s)\n"
+            perf_results += f"\nAll runs ({success_count} successful, {summary['failed_runs']} failed):\n"
+            perf_results += self._format_stats_table(summary['overall']) + "\n"
+            if summary['warmup']['runs'] and summary['steady_state']['runs']:
+                perf_results += f"\nWarm-up ({summary['warmup']['runs']} runs):\n"
+                perf_results += self._format_stats_table(summary['warmup']) + "\n"
+                perf_results += f"\nSteady state ({summary['steady_state']['runs']} runs):\n"
+                perf_results += self._format_stats_table(summary['steady_state']) + "\n"
             
             print(perf_results)
             
             # Write to log file if configured
-            if append_to_file and hasattr(self.conn_manager, 'config') and 'logdir' in self.conn_manager.config:
-                import os
-                log_dir = self.conn_manager.config['logdir']
-                if os.path.exists(log_dir):
-                    log_file = os.path.join(log_dir, f"{self.conn_manager.selected_connection['driver']}.perf.txt")
+            if append_to_file:
+                log_file = self._log_file('txt')
+                if log_file:
                     with open(log_file, 'a') as f:
                         f.write(perf_results)
+                    self.write_machine_readable(summary)
         else:
             print("No successful test runs to report.")
+
+
+def run_fetch_sweep(conn_manager, query: str, runs: int = 3, threads: int = 1, row_interval: int = 25000,
+                    array_sizes: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+    """Run the query with every fetch strategy and fetchmany array size and report the fastest.
+    
+    Returns one entry per strategy, ordered by steady-state rows/sec, best first.
+    """
+    array_sizes = array_sizes or DEFAULT_SWEEP_SIZES
+    configurations = [('fetchone', max(array_sizes)), ('iterate', max(array_sizes)), ('fetchall', max(array_sizes))]
+    configurations += [('fetchmany', size) for size in array_sizes]
+    
+    sweep = []
+    for strategy, array_size in configurations:
+        test = PerformanceTest(conn_manager, query, runs, threads, row_interval, strategy, array_size)
+        test.run_test()
+        summary = test.summarize()
+        if summary['successful_runs'] == 0:
+            print(f"{test.describe_strategy()} failed, skipping it in the sweep.")
+            continue
+        test.write_machine_readable(summary)
+        # Judge on the steady state when there is one
+        phase = summary['steady_state'] if summary['steady_state']['runs'] else summary['overall']
+        sweep.append({
+            'strategy': test.describe_strategy(),
+            'rows_per_sec': phase['rows_per_sec']['p50'],
+            'runtime': phase['runtime']['p50'],
+            'first_row_time': phase['first_row_time']['p50']
+        })
+    
+    sweep.sort(key=lambda entry: entry['rows_per_sec'], reverse=True)
+    if sweep:
+        rows = [[e['strategy'], f"{e['rows_per_sec']:.0f}", f"{e['runtime']*1000:.0f}", f"{e['first_row_time']*1000:.0f}"]
+                for e in sweep]
+        print("\n********* Fetch Strategy Sweep (p50) **************")
+        print(tabulate(rows, headers=["Strategy", "Rows/sec", "Runtime (ms)", "First row (ms)"], tablefmt='simple'))
+        print(f"\nBest strategy for {(conn_manager.selected_connection or {}).get('name')}: "
+              f"{sweep[0]['strategy']} ({sweep[0]['rows_per_sec']:.0f} rows/sec)")
+    else:
+        print("No successful test runs to report.")
+    return sweep
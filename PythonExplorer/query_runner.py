@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+QueryRunner - Runs a query on a worker thread so it can be timed out or cancelled
+The rows fetched before a timeout, Ctrl-C or the row limit are kept and returned.
+A query can also be run step by step with start and fetch, e.g. to page through it.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+# Why a query returned
+COMPLETE = 'complete'
+TIMEOUT = 'timeout'
+CANCELLED = 'cancelled'
+ROW_LIMIT = 'limit'
+
+
+class QueryRunner:
+    def __init__(self, cursor, timeout: float = 0, row_limit: int = 0, fetch_size: int = 1000,
+                 cancel_grace: float = 5.0):
+        """Initialize with the cursor to run on, a timeout in seconds and a row limit (0 for none)."""
+        self.cursor = cursor
+        self.timeout = timeout
+        self.row_limit = row_limit
+        self.fetch_size = fetch_size if row_limit <= 0 else max(min(fetch_size, row_limit + 1), 1)
+        self.cancel_grace = cancel_grace
+        self.columns: List[str] = []
+        self.rows: List[tuple] = []
+        self.status = COMPLETE
+        self._status_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        # Time spent in the driver so far, the timeout applies to it
+        self._elapsed = 0.0
+        self._delivered = 0
+
+    def _set_status(self, status: str):
+        """Record why the query stopped, both threads may try and the first reason wins."""
+        with self._status_lock:
+            if self.status == COMPLETE:
+                self.status = status
+
+    def _work(self, sql: str, args: Optional[Any]):
+        """Execute and fetch in chunks until done, stopped or past the row limit."""
+        try:
+            if args is None:
+                self.cursor.execute(sql)
+            else:
+                self.cursor.execute(sql, args)
+            self.columns = [desc[0] for desc in self.cursor.description]
+            while not self._stop.is_set():
+                chunk = self.cursor.fetchmany(self.fetch_size)
+                if not chunk:
+                    break
+                self.rows.extend(chunk)
+                if 0 < self.row_limit < len(self.rows):
+                    del self.rows[self.row_limit:]
+                    self._set_status(ROW_LIMIT)
+                    break
+        except BaseException as e:
+            # Errors raised because the query was cancelled are expected
+            if not self._stop.is_set():
+                self._error = e
+
+    def cancel(self) -> bool:
+        """Stop the query through the driver's cancel, or by closing the cursor. Returns True if cancel was used."""
+        self._stop.set()
+        cancel = getattr(self.cursor, 'cancel', None)
+        try:
+            if callable(cancel):
+                cancel()
+                return True
+            self.cursor.close()
+        except Exception:
+            pass
+        return False
+
+    def _wait(self, worker: threading.Thread):
+        """Wait for the worker until it finishes, the timeout passes or Ctrl-C is pressed, then stop it."""
+        start_time = time.time()
+        worker.start()
+        try:
+            # Join in short steps so Ctrl-C reaches this thread while the worker fetches
+            while worker.is_alive():
+                worker.join(0.1)
+                if (self.timeout > 0 and worker.is_alive() and
+                        self._elapsed + time.time() - start_time > self.timeout):
+                    self._set_status(TIMEOUT)
+                    break
+        except KeyboardInterrupt:
+            self._set_status(CANCELLED)
+        self._elapsed += time.time() - start_time
+
+        if worker.is_alive():
+            self.cancel()
+            worker.join(self.cancel_grace)
+            if worker.is_alive():
+                print("Warning: the driver did not stop the query, the connection may stay busy until it finishes.",
+                      file=sys.stderr)
+
+        if self._error is not None:
+            raise self._error
+
+    def run(self, sql: str, args: Optional[Any] = None) -> Tuple[List[str], List[tuple], str]:
+        """Run the query and return (columns, rows, status), with partial rows if it was stopped."""
+        self._wait(threading.Thread(target=self._work, args=(sql, args), daemon=True))
+        # Copy, the worker may still append if the driver ignored the cancel
+        with self._status_lock:
+            status = self.status
+        return self.columns, list(self.rows), status
+
+    def _call(self, fn):
+        """Run fn on the worker thread, keeping its result unless the query was stopped meanwhile."""
+        result = []
+
+        def work():
+            try:
+                value = fn()
+                if not self._stop.is_set():
+                    result.append(value)
+            except BaseException as e:
+                if not self._stop.is_set():
+                    self._error = e
+
+        self._wait(threading.Thread(target=work, daemon=True))
+        return result[0] if result else None
+
+    def start(self, sql: str, args: Optional[Any] = None) -> str:
+        """Execute the query without fetching, for callers that fetch with fetch(). Returns the status."""
+        def execute():
+            if args is None:
+                self.cursor.execute(sql)
+            else:
+                self.cursor.execute(sql, args)
+            self.columns = [desc[0] for desc in self.cursor.description]
+        self._call(execute)
+        return self.status
+
+    def fetch(self, size: int) -> List[tuple]:
+        """Fetch the next chunk of a started query, bounded by the timeout and the row limit.
+
+        Returns an empty list once the cursor is drained or the query was stopped; status
+        tells which. The timeout counts only the time spent in the driver.
+        """
+        if self.status == COMPLETE and 0 < self.timeout <= self._elapsed:
+            # Chunks that each finish quickly still add up to the timeout
+            self._set_status(TIMEOUT)
+            self.cancel()
+        if self.status != COMPLETE:
+            return []
+        if self.row_limit > 0:
+            # One row past the limit tells whether the query returned more
+            size = max(min(size, self.row_limit - self._delivered + 1), 1)
+        chunk = self._call(lambda: self.cursor.fetchmany(size)) or []
+        if self.status != COMPLETE:
+            return []
+        if 0 < self.row_limit < self._delivered + len(chunk):
+            chunk = chunk[:self.row_limit - self._delivered]
+            self._set_status(ROW_LIMIT)
+        self._delivered += len(chunk)
+        return chunk
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+ResultCache - Opt-in cache of SELECT results
+Keeps results in memory with byte-size based LRU eviction and optionally on disk as Parquet files
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set
+
+import pandas as pd
+
+TABLE_NAME = r'((?:\[[^\]]+\]|"[^"]+"|`[^`]+`|[\w$]+)(?:\.(?:\[[^\]]+\]|"[^"]+"|`[^`]+`|[\w$]+))*)'
+SOURCE_START_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+', re.IGNORECASE)
+SOURCE_TABLE_PATTERN = re.compile(TABLE_NAME)
+# Optional alias after a table or subquery, then a comma if another source follows
+SOURCE_ALIAS_PATTERN = re.compile(r'\s+(?:AS\s+)?(?!(?:WHERE|GROUP|ORDER|HAVING|LIMIT|UNION|JOIN|INNER|LEFT|RIGHT|'
+                                  r'FULL|CROSS|ON|OFFSET)\b)(?:\[[^\]]+\]|"[^"]+"|`[^`]+`|[\w$]+)', re.IGNORECASE)
+SOURCE_SEPARATOR_PATTERN = re.compile(r'\s*,\s*')
+MODIFIED_TABLE_PATTERN = re.compile(r'^\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|DELETE)\s+' + TABLE_NAME, re.IGNORECASE)
+
+
+def _table_key(name: str) -> str:
+    """Normalize a possibly qualified and quoted table name to its lower case table part."""
+    last = re.findall(r'\[([^\]]+)\]|"([^"]+)"|`([^`]+)`|([\w$]+)', name)[-1]
+    return next(part for part in last if part).lower()
+
+
+def _skip_parentheses(sql: str, position: int) -> int:
+    """Position after the parenthesis group starting at position."""
+    depth = 0
+    for index in range(position, len(sql)):
+        if sql[index] == '(':
+            depth += 1
+        elif sql[index] == ')':
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(sql)
+
+
+def referenced_tables(sql: str) -> Set[str]:
+    """Tables a SELECT reads from, found after JOIN and in the comma-separated list after FROM.
+    
+    Tables inside subqueries are found through their own FROM and JOIN.
+    """
+    tables = set()
+    for start in SOURCE_START_PATTERN.finditer(sql):
+        position = start.end()
+        while position < len(sql):
+            if sql[position] == '(':
+                position = _skip_parentheses(sql, position)
+            else:
+                match = SOURCE_TABLE_PATTERN.match(sql, position)
+                if not match:
+                    break
+                tables.add(_table_key(match.group(1)))
+                position = match.end()
+            alias = SOURCE_ALIAS_PATTERN.match(sql, position)
+            if alias:
+                position = alias.end()
+            separator = SOURCE_SEPARATOR_PATTERN.match(sql, position)
+            if not separator:
+                break
+            position = separator.end()
+    return tables
+
+
+def modified_table(sql: str) -> Optional[str]:
+    """Table an INSERT, UPDATE or DELETE writes to, or None for other statements."""
+    match = MODIFIED_TABLE_PATTERN.match(sql)
+    return _table_key(match.group(1)) if match else None
+
+
+class ResultCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        """Initialize the cache with a memory budget and an optional directory and size budget for the disk tier."""
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(connection_name: str, sql: str, params: Any = None) -> str:
+        """Key of a query: connection name, normalized SQL text and bound parameters."""
+        normalized = re.sub(r'\s+', ' ', sql).strip().rstrip(';').strip()
+        text = json.dumps([connection_name, normalized, params], default=repr, sort_keys=True)
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, ttl: float) -> Optional[pd.DataFrame]:
+        """Return the cached result if it is younger than ttl seconds."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry['created'] <= ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry['df']
+                self._remove(key)
+
+        entry = self._read_disk(key, ttl)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._add(key, entry)
+        return entry['df']
+
+    def put(self, key: str, connection_name: str, sql: str, df: pd.DataFrame):
+        """Store a result in memory and, if configured, on disk."""
+        entry = {
+            'df': df,
+            'connection': connection_name,
+            'tables': sorted(referenced_tables(sql)),
+            'created': time.time(),
+            'bytes': int(df.memory_usage(index=False, deep=True).sum())
+        }
+        if entry['bytes'] > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._add(key, entry)
+        self._write_disk(key, entry)
+
+    def invalidate_tables(self, connection_name: str, tables: Set[str]) -> int:
+        """Drop every cached result of the connection that reads one of the tables."""
+        tables = {t.lower() for t in tables}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry['connection'] == connection_name and tables.intersection(entry['tables'])]
+            for key in stale:
+                self._remove(key)
+        stale += self._invalidate_disk(connection_name, tables, set(stale))
+        with self._lock:
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop all cached results from memory and disk."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        for name in self._disk_files():
+            os.remove(os.path.join(self.disk_dir, name))
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the size of the cache."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'disk_entries': len([n for n in self._disk_files() if n.endswith('.json')])
+            }
+
+    # Memory tier, callers hold the lock
+
+    def _add(self, key: str, entry: Dict[str, Any]):
+        self._entries[key] = entry
+        self.bytes += entry['bytes']
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self.bytes -= entry['bytes']
+
+    # Disk tier: <key>.parquet with a <key>.json sidecar describing it
+
+    def _disk_files(self) -> List[str]:
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return []
+        return [n for n in os.listdir(self.disk_dir) if n.endswith(('.parquet', '.json'))]
+
+    def _remove_disk(self, key: str):
+        for ext in ('.json', '.parquet'):
+            path = os.path.join(self.disk_dir, key + ext)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write_disk(self, key: str, entry: Dict[str, Any]):
+        if not self.disk_dir:
+            return
+        parquet_file = os.path.join(self.disk_dir, f"{key}.parquet")
+        try:
+            entry['df'].to_parquet(parquet_file, index=False)
+        except ImportError as e:
+            # pyarrow is optional, without it keep the memory tier only
+            print(f"Warning: the disk cache needs pyarrow, using the memory cache only: {e}")
+            self.disk_dir = None
+            return
+        except Exception as e:
+            # e.g. a mixed-type column that doesn't convert, only this result stays off disk
+            print(f"Warning: could not write the result to the disk cache: {e}")
+            self._remove_disk(key)
+            return
+        meta = {k: v for k, v in entry.items() if k != 'df'}
+        meta['disk_bytes'] = os.path.getsize(parquet_file)
+        with open(os.path.join(self.disk_dir, f"{key}.json"), 'w') as f:
+            json.dump(meta, f)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete the least recently used results on disk until the disk tier fits max_disk_bytes."""
+        files = []
+        for name in self._disk_files():
+            if name.endswith('.parquet'):
+                path = os.path.join(self.disk_dir, name)
+                meta_file = path[:-len('.parquet')] + '.json'
+                try:
+                    # Disk hits touch the sidecar, so its mtime is the last use
+                    used = os.path.getmtime(meta_file) if os.path.exists(meta_file) else 0
+                    files.append((used, os.path.getsize(path), name[:-len('.parquet')]))
+                except OSError:
+                    continue
+        total = sum(size for _, size, _ in files)
+        for _, size, key in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            self._remove_disk(key)
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def _read_disk(self, key: str, ttl: float) -> Optional[Dict[str, Any]]:
+        if not self.disk_dir:
+            return None
+        meta_file = os.path.join(self.disk_dir, f"{key}.json")
+        if not os.path.exists(meta_file):
+            return None
+        try:
+            with open(meta_file) as f:
+                entry = json.load(f)
+            if time.time() - entry['created'] > ttl:
+                self._remove_disk(key)
+                return None
+            entry['df'] = pd.read_parquet(os.path.join(self.disk_dir, f"{key}.parquet"))
+            os.utime(meta_file)
+            entry.pop('disk_bytes', None)
+            return entry
+        except Exception:
+            return None
+
+    def _invalidate_disk(self, connection_name: str, tables: Set[str], already_removed: Set[str]) -> List[str]:
+        removed = []
+        for name in self._disk_files():
+            if not name.endswith('.json'):
+                continue
+            key = name[:-len('.json')]
+            try:
+                with open(os.path.join(self.disk_dir, name)) as f:
+                    meta = json.load(f)
+            except Exception:
+                continue
+            if meta.get('connection') == connection_name and tables.intersection(meta.get('tables', [])):
+                self._remove_disk(key)
+                if key not in already_removed:
+                    removed.append(key)
+        return removed
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+ResultExporter - Streams query results from a cursor into Parquet, Arrow IPC or CSV files
+Only one batch of rows is held in memory at a time
+"""
+
+import csv
+import gzip
+import os
+import time
+from typing import List, Optional
+
+
+class ResultExporter:
+    # File extension to format, longest extensions are matched first
+    FORMATS = [
+        ('.csv.gz', 'csv'),
+        ('.parquet', 'parquet'),
+        ('.arrow', 'arrow'),
+        ('.feather', 'arrow'),
+        ('.ipc', 'arrow'),
+        ('.csv', 'csv'),
+    ]
+
+    def __init__(self, cursor, filename: str, batch_size: int = 10000,
+                 compression: Optional[str] = None, progress_interval: int = 100000):
+        """Initialize with an executed cursor and the output file.
+
+        Args:
+            cursor: Cursor positioned before the first row
+            filename: Output file, the format is picked from the extension
+            batch_size: Rows fetched with each fetchmany call
+            compression: Codec, e.g. snappy/zstd/gzip for Parquet, lz4/zstd for Arrow, gzip for CSV.
+                         Parquet defaults to snappy and .csv.gz files to gzip.
+            progress_interval: Print progress every this many rows
+        """
+        self.cursor = cursor
+        self.filename = filename
+        self.batch_size = max(int(batch_size), 1)
+        self.progress_interval = progress_interval
+        self.format = self.detect_format(filename)
+        self.compression = None if compression in (None, '', 'none') else compression
+        if self.compression is None and filename.lower().endswith('.gz'):
+            self.compression = 'gzip'
+        self.columns = [desc[0] for desc in cursor.description]
+        self.rows = 0
+        self._start_time = None
+        self._next_progress = progress_interval
+
+    @classmethod
+    def detect_format(cls, filename: str) -> str:
+        """Get the export format from the file extension."""
+        for extension, file_format in cls.FORMATS:
+            if filename.lower().endswith(extension):
+                return file_format
+        raise ValueError(f"Unsupported export file {filename}. Use .parquet, .arrow, .feather, .ipc, .csv or .csv.gz.")
+
+    def _batches(self):
+        """Yield batches of rows until the cursor is drained."""
+        while True:
+            batch = self.cursor.fetchmany(self.batch_size)
+            if not batch:
+                return
+            yield batch
+
+    def export(self) -> int:
+        """Write all rows to the file and return the number of rows written."""
+        start_time = time.time()
+        self._start_time = start_time
+
+        if self.format == 'csv':
+            self._export_csv()
+        else:
+            self._export_arrow()
+
+        duration = time.time() - start_time
+        rate = self.rows / duration if duration > 0 else 0
+        print(f"Exported {self.rows} rows to {self.filename} in {duration:.3f} seconds ({rate:.0f} rows/sec)")
+        return self.rows
+
+    def _progress(self, batch_rows: int):
+        """Count the rows of a batch and print progress at each interval."""
+        self.rows += batch_rows
+        if self.progress_interval and self.rows >= self._next_progress:
+            elapsed = time.time() - self._start_time
+            print(f"Rows: {self.rows:10d} Rate: {self.rows / elapsed if elapsed > 0 else 0:.0f} rows/sec")
+            self._next_progress = (self.rows // self.progress_interval + 1) * self.progress_interval
+
+    def _export_csv(self):
+        if self.compression not in (None, 'gzip'):
+            raise ValueError(f"Unsupported CSV compression {self.compression}, use gzip.")
+        temp = self.filename + '.tmp'
+        try:
+            with (gzip.open(temp, 'wt', newline='') if self.compression == 'gzip' else open(temp, 'w', newline='')) as f:
+                writer = csv.writer(f)
+                writer.writerow(self.columns)
+                for batch in self._batches():
+                    writer.writerows(batch)
+                    self._progress(len(batch))
+        except BaseException:
+            self._remove(temp)
+            raise
+        os.replace(temp, self.filename)
+
+    def _export_arrow(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Exporting to Parquet or Arrow requires pyarrow. Install it with: pip3 install pyarrow")
+
+        # Rows go to a temporary file that only replaces the target once the export succeeded
+        temp = self.filename + '.tmp'
+        writer = None
+        schema = None
+        try:
+            for batch in self._batches():
+                table = self._to_table(pa, batch)
+                if schema is None:
+                    # Columns that are all NULL in the first batch have no type yet, write them as strings
+                    schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                                        for f in table.schema])
+                    writer = self._open_writer(pa, temp, schema)
+                else:
+                    widened = self._widen_schema(pa, schema, table.schema)
+                    if widened != schema:
+                        # A later batch needs a wider type, rewrite what was written so far with it
+                        writer.close()
+                        writer = None
+                        writer = self._rewrite(pa, temp, widened)
+                        schema = widened
+                writer.write_table(self._conform(pa, table, schema))
+                self._progress(len(batch))
+
+            if writer is None:
+                # Empty result, still write a file with the columns
+                schema = pa.schema([pa.field(name, pa.string()) for name in self.columns])
+                writer = self._open_writer(pa, temp, schema)
+            writer.close()
+            writer = None
+            os.replace(temp, self.filename)
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            self._remove(temp)
+            raise
+
+    @staticmethod
+    def _remove(path: str):
+        if os.path.exists(path):
+            os.remove(path)
+
+    def _to_table(self, pa, batch: List[tuple]):
+        """Convert a batch of row tuples into an Arrow table, column by column, with inferred types."""
+        arrays = []
+        for values in zip(*batch):
+            try:
+                arrays.append(pa.array(list(values)))
+            except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError):
+                # Mixed-type column, keep it as strings
+                arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=self.columns)
+
+    @staticmethod
+    def _widen_type(pa, current, new):
+        """The type that holds values of both current and new, e.g. double for int64 and double,
+        the larger precision and scale for decimals, and string for types that don't mix."""
+        if new == current or pa.types.is_null(new):
+            return current
+        try:
+            return pa.unify_schemas([pa.schema([('f', current)]), pa.schema([('f', new)])],
+                                    promote_options='permissive').field('f').type
+        except (pa.ArrowInvalid, pa.ArrowTypeError, NotImplementedError):
+            return pa.string()
+
+    def _widen_schema(self, pa, schema, batch_schema):
+        return pa.schema([pa.field(field.name, self._widen_type(pa, field.type, batch_field.type))
+                          for field, batch_field in zip(schema, batch_schema)])
+
+    @staticmethod
+    def _conform(pa, table, schema):
+        """Cast a batch to the file schema. Casts are safe, so values are never silently truncated."""
+        arrays = []
+        for column, field in zip(table.columns, schema):
+            if column.type == field.type:
+                arrays.append(column)
+            elif pa.types.is_string(field.type) and not pa.types.is_null(column.type):
+                arrays.append(pa.array([None if v is None else str(v) for v in column.to_pylist()], type=pa.string()))
+            else:
+                arrays.append(column.cast(field.type))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def _rewrite(self, pa, path: str, schema):
+        """Copy the batches written to path into a new file with the widened schema, one batch at a time."""
+        old = path + '.old'
+        os.replace(path, old)
+        writer = self._open_writer(pa, path, schema)
+        try:
+            with open(old, 'rb') as f:
+                if self.format == 'parquet':
+                    import pyarrow.parquet as pq
+                    batches = pq.ParquetFile(f).iter_batches(batch_size=self.batch_size)
+                else:
+                    import pyarrow.ipc as ipc
+                    reader = ipc.open_file(f)
+                    batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+                for record_batch in batches:
+                    writer.write_table(self._conform(pa, pa.Table.from_batches([record_batch]), schema))
+        except BaseException:
+            writer.close()
+            raise
+        finally:
+            self._remove(old)
+        return writer
+
+    def _open_writer(self, pa, path: str, schema):
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            return pq.ParquetWriter(path, schema, compression=self.compression or 'snappy')
+        import pyarrow.ipc as ipc
+        options = ipc.IpcWriteOptions(compression=self.compression) if self.compression else None
+        return ipc.new_file(path, schema, options=options)
@@ -4,46 +4,68 @@ ResultSetHelper - Python equivalent of ResultSetHelper.groovy
 Handles result set display and formatting
 """
 
+import sys
 import pandas as pd
+from collections import deque
 from typing import List, Dict, Any, Optional
-from tabulate import tabulate
+from page_renderer import PageRenderer
+from query_runner import COMPLETE
+
+
+# Rows sampled per column when inferring display widths
+WIDTH_SAMPLE_SIZE = 1000
+MAX_COLUMN_WIDTH = 50
+
+
+def column_width(series: pd.Series, name: str, sample_size: int = WIDTH_SAMPLE_SIZE) -> int:
+    """Infer the display width of a column from its type, or from a bounded sample of its values."""
+    col_type = str(series.dtype)
+    if 'datetime' in col_type:
+        return 22
+    if 'int' in col_type:
+        return 10
+    if 'float' in col_type:
+        return 15
+    
+    # Evenly spaced rows so long values further down are still seen, the string
+    # conversion only touches the sample and not the whole column
+    step = max(len(series) // max(sample_size, 1), 1)
+    sample = series.iloc[::step].iloc[:sample_size]
+    max_len = sample.astype(str).str.len().max() if not sample.empty else 0
+    return min(max(len(str(name)), int(max_len)), MAX_COLUMN_WIDTH)
 
 
 class ResultSetHelper:
-    def __init__(self, data):
+    def __init__(self, data, sample_size: int = WIDTH_SAMPLE_SIZE):
         """Initialize with either a pandas DataFrame or a list of dictionaries."""
         if isinstance(data, pd.DataFrame):
             self.df = data
         else:
             # Convert list of dictionaries to DataFrame
             self.df = pd.DataFrame(data)
+        self.sample_size = sample_size
+        # Inferred widths per column, widened as pages are shown
+        self.column_widths: Dict[str, int] = {}
+    
+    def update_widths(self, page_df: pd.DataFrame, columns: Optional[List[str]] = None) -> Dict[str, int]:
+        """Widen the cached column widths with the values of a page."""
+        for col in (page_df.columns if columns is None else columns):
+            width = column_width(page_df[col], col, self.sample_size)
+            if width > self.column_widths.get(col, 0):
+                self.column_widths[col] = width
+        return self.column_widths
     
     def pick_columns(self) -> Dict[str, int]:
         """Select columns to display based on smart column selection."""
         if self.df.empty:
             return {}
         
-        all_cols = {}
         selected_cols = {}
         
-        # Calculate column widths based on data types and content
-        for col in self.df.columns:
-            col_type = str(self.df[col].dtype)
-            if 'datetime' in col_type:
-                width = 22
-            elif 'int' in col_type:
-                width = 10
-            elif 'float' in col_type:
-                width = 15
-            else:
-                # For string columns, use max length of data or column name
-                max_len = max(
-                    len(str(col)),
-                    self.df[col].astype(str).str.len().max() if not self.df[col].empty else 0
-                )
-                width = min(max_len, 50)  # Cap at 50 characters
-        
-            all_cols[col] = width
+        # Calculate column widths based on data types and a sample of the content
+        all_cols = {col: self.column_widths[col] if col in self.column_widths else column_width(self.df[col], col, self.sample_size)
+                    for col in self.df.columns}
+        self.column_widths.update(all_cols)
         
         # Smart column selection: prefer id, name, date columns
         selected = False
@@ -72,29 +94,33 @@ class ResultSetHelper:
         
         return selected_cols
     
-    def show_results(self, cols: Optional[Dict[str, int]] = None, page_size: int = 200):
+    def show_results(self, cols: Optional[Dict[str, int]] = None, page_size: int = 200, display_format: str = 'grid'):
         """Display results in a formatted table."""
+        status = sys.stderr if PageRenderer.is_data_format(display_format) else sys.stdout
         if self.df.empty:
-            print("No results to display.")
+            print("No results to display.", file=status)
             return
         
         if cols is None:
-            cols = self.pick_columns()
+            # Data formats for piping keep every column
+            cols = {col: 0 for col in self.df.columns} if PageRenderer.is_data_format(display_format) else self.pick_columns()
         
         # Select only the columns we want to display
         display_df = self.df[list(cols.keys())]
         
         # Format the display
+        renderer = PageRenderer(cols, display_format)
         total_rows = len(display_df)
         start_row = 0
         
         while start_row < total_rows:
-            end_row = min(start_row + int(page_size), total_rows)
+            end_row = total_rows if int(page_size) == -1 else min(start_row + int(page_size), total_rows)
             page_df = display_df.iloc[start_row:end_row]
+            self.update_widths(page_df)
+            renderer.widths = {col: self.column_widths[col] for col in cols}
             
             # Display the page
-            print(f"\nRows {start_row + 1}-{end_row} of {total_rows}:")
-            print(tabulate(page_df, headers='keys', tablefmt='grid', showindex=False))
+            renderer.write_page(page_df, f"Rows {start_row + 1}-{end_row} of {total_rows}")
             
             # Ask if user wants to see more
             if end_row < total_rows and page_size != -1:
@@ -104,7 +130,7 @@ class ResultSetHelper:
             
             start_row = end_row
         
-        print(f"\nTotal Rows: {total_rows}")
+        print(f"\nTotal Rows: {total_rows}", file=status)
     
     def write_result_set_to_file(self, filename: str, columns: List[str]):
         """Write results to a CSV file."""
@@ -126,3 +152,99 @@ class ResultSetHelper:
         """Check if file exists."""
         import os
         return os.path.exists(filename)
+
+
+class StreamingResultSet:
+    """Pages through an open cursor with fetchmany instead of materializing the whole result.
+    
+    Only the page being shown plus `read_ahead` fetched chunks are held in memory.
+    The total row count is known only once the cursor has been drained.
+    """
+    
+    def __init__(self, cursor, page_size: int = 100, read_ahead: int = 1, sample_size: int = WIDTH_SAMPLE_SIZE,
+                 display_format: str = 'grid', runner=None):
+        """Initialize with an executed cursor, the page size and the number of chunks to read ahead.
+        
+        With a started QueryRunner the chunks are fetched through it, so its timeout, row limit
+        and Ctrl-C cancel apply; reading stops at the rows fetched before it stopped.
+        """
+        self.cursor = cursor
+        self.runner = runner
+        self.page_size = int(page_size)
+        # pagesize -1 dumps everything, still fetch in bounded chunks
+        self.fetch_size = self.page_size if self.page_size > 0 else 1000
+        self.read_ahead = max(int(read_ahead), 1)
+        self.columns = [desc[0] for desc in cursor.description]
+        self.buffer = deque()
+        self.exhausted = False
+        self.rows_fetched = 0
+        self.sample_size = sample_size
+        self.display_format = display_format
+    
+    def _fill_buffer(self):
+        """Fetch chunks until the read-ahead buffer is full or the cursor is drained."""
+        while not self.exhausted and len(self.buffer) < self.read_ahead:
+            if self.runner is not None:
+                chunk = self.runner.fetch(self.fetch_size)
+                # A stopped query has nothing more to read
+                self.exhausted = self.runner.status != COMPLETE
+            else:
+                chunk = self.cursor.fetchmany(self.fetch_size)
+            if not chunk:
+                self.exhausted = True
+            else:
+                self.buffer.append(chunk)
+                self.rows_fetched += len(chunk)
+    
+    def has_more(self) -> bool:
+        """Check if there are more rows to show."""
+        self._fill_buffer()
+        return len(self.buffer) > 0
+    
+    def next_page(self) -> Optional[pd.DataFrame]:
+        """Return the next chunk as a DataFrame, or None once the cursor is drained."""
+        if not self.has_more():
+            return None
+        return pd.DataFrame(self.buffer.popleft(), columns=self.columns)
+    
+    def show_results(self, cols: Optional[Dict[str, int]] = None):
+        """Display results page by page as chunks arrive from the cursor."""
+        start_row = 0
+        helper = None
+        renderer = None
+        
+        while True:
+            page_df = self.next_page()
+            if page_df is None:
+                break
+            
+            # Columns are picked from the first page, widths are cached and widened by later pages
+            if helper is None:
+                helper = ResultSetHelper(page_df, self.sample_size)
+                if cols is None:
+                    cols = {col: 0 for col in self.columns} if PageRenderer.is_data_format(self.display_format) else helper.pick_columns()
+                renderer = PageRenderer(cols, self.display_format)
+            helper.update_widths(page_df, cols)
+            renderer.widths = {col: helper.column_widths[col] for col in cols}
+            
+            end_row = start_row + len(page_df)
+            more = self.has_more()
+            total = "" if more else f" of {end_row}"
+            renderer.write_page(page_df, f"Rows {start_row + 1}-{end_row}{total}")
+            start_row = end_row
+            
+            # Ask if user wants to see more
+            if more and self.page_size != -1:
+                response = input(f"\n{end_row} rows. Do you want to see more [Y/N]? ").lower()
+                if response != 'y':
+                    break
+        
+        status = sys.stderr if PageRenderer.is_data_format(self.display_format) else sys.stdout
+        if start_row == 0:
+            print("No results to display.", file=status)
+        elif self.runner is not None and self.runner.status != COMPLETE:
+            print(f"\nRows shown: {start_row}", file=status)
+        elif self.exhausted and not self.buffer:
+            print(f"\nTotal Rows: {start_row}", file=status)
+        else:
+            print(f"\nRows shown: {start_row} (result not fully read, total unknown)", file=status)
@@ -4,10 +4,119 @@ SQLCommand - Python equivalent of SQLCommand.groovy
 Handles SQL query execution and parameter handling
 """
 
+import csv
+import datetime
+import itertools
+import json
 import time
 import re
-from typing import Dict, Any, List
-import pandas as pd
+import sys
+from typing import TYPE_CHECKING, Dict, Any, Iterator, List, Optional, Tuple
+
+import query_runner
+
+if TYPE_CHECKING:
+    # pandas is imported when a result is first materialized, it isn't needed for DML or exports
+    import pandas as pd
+
+# Parameter placeholders like :name
+PARAM_PATTERN = r':(\w+)'
+
+INT_PATTERN = re.compile(r'-?(0|[1-9]\d*)')
+FLOAT_PATTERN = re.compile(r'-?\d+\.\d+([eE][-+]?\d+)?')
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+DATETIME_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?')
+
+
+def infer_param_type(value: str):
+    """Convert a parameter typed at the console into an int, float, date, datetime or None.
+    
+    NULL becomes None. Quote a value ('00123') to keep it a string; numbers with
+    leading zeros are kept as strings as well.
+    """
+    text = value.strip()
+    if text.upper() == 'NULL':
+        return None
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in ("'", '"'):
+        return text[1:-1]
+    if INT_PATTERN.fullmatch(text):
+        return int(text)
+    if FLOAT_PATTERN.fullmatch(text):
+        return float(text)
+    try:
+        if DATE_PATTERN.fullmatch(text):
+            return datetime.date.fromisoformat(text)
+        if DATETIME_PATTERN.fullmatch(text):
+            return datetime.datetime.fromisoformat(text)
+    except ValueError:
+        pass
+    return value
+
+
+def to_driver_sql(query: str, paramstyle: str = 'qmark') -> Tuple[str, List[str]]:
+    """Rewrite :name placeholders into the driver's DB-API paramstyle.
+    
+    Returns the rewritten SQL and the parameter names in the order the driver expects
+    positional values. Named styles keep one entry per distinct name.
+    """
+    names = []
+    
+    def replace(match):
+        name = match.group(1)
+        if paramstyle in ('named', 'pyformat'):
+            if name not in names:
+                names.append(name)
+            return f":{name}" if paramstyle == 'named' else f"%({name})s"
+        names.append(name)
+        if paramstyle == 'numeric':
+            return f":{len(names)}"
+        if paramstyle == 'format':
+            return "%s"
+        return "?"
+    
+    return re.sub(PARAM_PATTERN, replace, query), names
+
+
+def read_batch_rows(source: str, names: List[str]) -> Iterator[tuple]:
+    """Yield parameter tuples from a CSV, JSON or JSONL file, or from CSV lines typed at the console for '-'.
+    
+    Files are matched to the parameters by column name; console lines give one value per
+    distinct name, in the order prompted. Console values are typed with infer_param_type like
+    console parameters; CSV values stay strings and JSON values are used as they are.
+    """
+    if source == '-':
+        distinct = list(dict.fromkeys(names))
+        print(f"Enter values for ({', '.join(distinct)}) as CSV lines, type [end] to finish.")
+        while True:
+            line = input("batchrow > ")
+            if line.strip().lower() == "end":
+                return
+            if not line.strip():
+                continue
+            values = next(csv.reader([line]))
+            if len(values) != len(distinct):
+                print(f"Expected {len(distinct)} values, got {len(values)}; row skipped.")
+                continue
+            record = dict(zip(distinct, values))
+            yield tuple(infer_param_type(record[name]) for name in names)
+        return
+    
+    with open(source, newline='') as f:
+        if source.lower().endswith('.jsonl'):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    yield tuple(record.get(name) for name in names)
+        elif source.lower().endswith('.json'):
+            for record in json.load(f):
+                yield tuple(record.get(name) for name in names)
+        else:
+            reader = csv.DictReader(f)
+            missing = [name for name in names if name not in (reader.fieldnames or [])]
+            if missing:
+                raise ValueError(f"Columns {missing} are missing from the header of {source}")
+            for record in reader:
+                yield tuple(record[name] for name in names)
 
 
 class SQLCommand:
@@ -22,64 +131,222 @@ class SQLCommand:
     def get_params_from_console(self):
         """Get parameter values from console input for parameterized queries."""
         # Find all parameter placeholders like :name
-        param_pattern = r':(\w+)'
-        params = re.findall(param_pattern, self.query)
+        params = re.findall(PARAM_PATTERN, self.query)
         
         for param in params:
             if param not in self.params:
                 value = input(f"{param}: ")
-                self.params[param] = value
+                self.params[param] = infer_param_type(value)
+    
+    def bind_params(self, query: str, params: Dict[str, Any]) -> Tuple[str, Any]:
+        """Rewrite :name placeholders for the driver and return the SQL with its bind parameters.
+        
+        The values are passed to the driver instead of being inlined as literals, so the SQL
+        text stays the same across values and the statement can be reused.
+        """
+        paramstyle = self.connection_manager.get_paramstyle() if self.connection_manager else 'qmark'
+        sql, names = to_driver_sql(query, paramstyle)
+        if not names:
+            return query, None
+        if paramstyle in ('named', 'pyformat'):
+            return sql, {name: params[name] for name in names}
+        return sql, tuple(params[name] for name in names)
+    
+    def _get_cursor(self, sql: str):
+        """Get a cursor for the SQL text, reusing the prepared statement of an earlier run if cached.
+        
+        Returns the cursor and the statement cache it belongs to (None for a one-off cursor).
+        """
+        cache = self.connection_manager.get_statement_cache(self.connection) if self.connection_manager else None
+        if cache is None:
+            return self.connection.cursor(), None
+        return cache.cursor(sql), cache
+    
+    def _release_cursor(self, cursor, cache, sql: str, failed: bool = False):
+        """Close a one-off cursor, or drop a cached one that failed."""
+        if cache is None:
+            cursor.close()
+        elif failed:
+            cache.discard(sql)
     
-    def replace_params_in_query(self, query: str, params: Dict[str, str]) -> str:
-        """Replace parameter placeholders with actual values."""
-        for param, value in params.items():
-            query = query.replace(f':{param}', f"'{value}'")
-        return query
+    def _execute(self, sql: str, args: Optional[Any]):
+        """Execute the SQL with its bind parameters on a (cached) cursor."""
+        cursor, cache = self._get_cursor(sql)
+        try:
+            if args is None:
+                cursor.execute(sql)
+            else:
+                cursor.execute(sql, args)
+        except Exception:
+            self._release_cursor(cursor, cache, sql, failed=True)
+            raise
+        return cursor, cache
     
-    def run_select(self):
+    def run_select(self) -> bool:
         """Execute a SELECT query and display results."""
         self.get_params_from_console()
         
         start_time = time.time()
         
         try:
-            # Replace parameters in query
-            final_query = self.replace_params_in_query(self.query, self.params)
+            # Pass parameters to the driver as bind parameters
+            final_query, args = self.bind_params(self.query, self.params)
             
-            # Execute query and get results as DataFrame manually to avoid pandas warning
-            cursor = self.connection.cursor()
-            cursor.execute(final_query)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            df = pd.DataFrame(results, columns=columns)
-            cursor.close()
+            if self.connection_manager and self.connection_manager.get_config_bool('streaming'):
+                status = self.run_select_streaming(final_query, args)
+                duration = time.time() - start_time
+                print(f"Total Time: {duration:.3f} seconds", file=self._status_out())
+                return status in (query_runner.COMPLETE, query_runner.ROW_LIMIT)
+
+            status = query_runner.COMPLETE
+            df = self._get_cached_result(final_query, args)
+            if df is None:
+                # Execute query and get results as DataFrame manually to avoid pandas warning
+                columns, results, status = self._run_query(final_query, args)
+                import pandas as pd
+                df = pd.DataFrame(results, columns=columns)
+                if status == query_runner.COMPLETE:
+                    self._put_cached_result(final_query, args, df)
+            else:
+                print("Result served from the query cache.", file=self._status_out())
             
             # Display results using ResultSetHelper
             from result_set_helper import ResultSetHelper
-            helper = ResultSetHelper(df)
-            helper.show_results(page_size=self.page_size)
+            helper = ResultSetHelper(df, self._width_sample_size())
+            helper.show_results(page_size=self.page_size, display_format=self._display_format())
             
             duration = time.time() - start_time
-            print(f"Total Time: {duration:.3f} seconds")
+            print(f"Total Time: {duration:.3f} seconds", file=self._status_out())
+            # Partial results of a stopped query are shown but the query didn't succeed
+            return status in (query_runner.COMPLETE, query_runner.ROW_LIMIT)
             
         except Exception as e:
             print(f"Error executing query: {e}")
             if self.connection_manager and self.connection_manager.is_debug_enabled():
                 import traceback
                 traceback.print_exc()
+            return False
+    
+    def _query_runner(self, cursor) -> Tuple['query_runner.QueryRunner', int, int]:
+        """QueryRunner for the cursor, bounded by querytimeout and rowlimit. Returns it with both settings."""
+        timeout = self.connection_manager.get_config_int('querytimeout', 0) if self.connection_manager else 0
+        row_limit = self.connection_manager.get_config_int('rowlimit', 0) if self.connection_manager else 0
+        return query_runner.QueryRunner(cursor, timeout, row_limit), timeout, row_limit
+    
+    def _report_stop(self, status: str, rows: int, timeout: int, row_limit: int):
+        """Say why a query stopped before all rows were read."""
+        if status == query_runner.TIMEOUT:
+            print(f"Query stopped after {timeout} seconds (querytimeout), showing the {rows} rows fetched so far.", file=self._status_out())
+        elif status == query_runner.CANCELLED:
+            print(f"Query cancelled, showing the {rows} rows fetched so far.", file=self._status_out())
+        elif status == query_runner.ROW_LIMIT:
+            print(f"Showing the first {row_limit} rows (rowlimit), the query returned more.", file=self._status_out())
+    
+    def _run_query(self, final_query: str, args: Optional[Any]) -> Tuple[List[str], List[tuple], str]:
+        """Run a query on a worker thread, bounded by querytimeout and rowlimit and stoppable with Ctrl-C.
+        
+        Returns the columns, the rows fetched and why the query returned.
+        """
+        cursor, cache = self._get_cursor(final_query)
+        runner, timeout, row_limit = self._query_runner(cursor)
+        try:
+            columns, rows, status = runner.run(final_query, args)
+        except Exception:
+            self._release_cursor(cursor, cache, final_query, failed=True)
+            raise
+        # A stopped or unfinished cursor isn't reused for the next run of the statement
+        self._release_cursor(cursor, cache, final_query, failed=(status != query_runner.COMPLETE))
+        self._report_stop(status, len(rows), timeout, row_limit)
+        return columns, rows, status
+    
+    def _width_sample_size(self) -> int:
+        """Rows sampled per column when inferring display widths."""
+        from result_set_helper import WIDTH_SAMPLE_SIZE
+        if self.connection_manager is None:
+            return WIDTH_SAMPLE_SIZE
+        return self.connection_manager.get_config_int('widthsample', WIDTH_SAMPLE_SIZE)
     
-    def run_command(self, is_insert: bool = False):
+    def _display_format(self) -> str:
+        """How result pages are rendered: grid, plain, tsv, csv, jsonl or tabulate."""
+        if self.connection_manager is None:
+            return 'grid'
+        return str(self.connection_manager.config.get('displayformat', 'grid'))
+    
+    def _status_out(self):
+        """Stream for timings and notes: stderr when results are written as data for piping."""
+        from page_renderer import PageRenderer
+        return sys.stderr if PageRenderer.is_data_format(self._display_format()) else sys.stdout
+    
+    def _result_cache_key(self, final_query: str, args: Optional[Any]):
+        """Get the result cache, its TTL and the key of the query, or (None, 0, None) when caching is off."""
+        if self.connection_manager is None:
+            return None, 0, None
+        ttl = self.connection_manager.get_result_cache_ttl()
+        if ttl <= 0:
+            return None, 0, None
+        cache = self.connection_manager.get_result_cache()
+        name = self.connection_manager.selected_connection['name']
+        return cache, ttl, cache.make_key(name, final_query, args)
+    
+    def _get_cached_result(self, final_query: str, args: Optional[Any]) -> Optional['pd.DataFrame']:
+        """Look up a SELECT result in the query cache."""
+        cache, ttl, key = self._result_cache_key(final_query, args)
+        return cache.get(key, ttl) if cache else None
+    
+    def _put_cached_result(self, final_query: str, args: Optional[Any], df: 'pd.DataFrame'):
+        """Store a SELECT result in the query cache."""
+        cache, ttl, key = self._result_cache_key(final_query, args)
+        if cache:
+            cache.put(key, self.connection_manager.selected_connection['name'], final_query, df)
+    
+    def _invalidate_cached_results(self, statement: str):
+        """Drop cached results that read the table an INSERT, UPDATE or DELETE modified."""
+        if self.connection_manager is None or self.connection_manager.result_cache is None:
+            return
+        from result_cache import modified_table
+        table = modified_table(statement)
+        if table:
+            self.connection_manager.result_cache.invalidate_tables(
+                self.connection_manager.selected_connection['name'], {table})
+    
+    def run_select_streaming(self, final_query: str, args: Optional[Any] = None) -> str:
+        """Execute a SELECT query and page through the cursor without fetching all rows up front.
+        
+        Execution and each fetch go through a QueryRunner, so querytimeout (counting the time
+        spent in the driver, not the time spent reading pages), rowlimit and Ctrl-C apply.
+        Returns why the query stopped.
+        """
+        from result_set_helper import StreamingResultSet
+
+        read_ahead = self.connection_manager.get_config_int('readahead', 1) if self.connection_manager else 1
+        cursor, cache = self._get_cursor(final_query)
+        runner, timeout, row_limit = self._query_runner(cursor)
+        failed = True
+        try:
+            if runner.start(final_query, args) == query_runner.COMPLETE:
+                stream = StreamingResultSet(cursor, self.page_size, read_ahead, self._width_sample_size(),
+                                            self._display_format(), runner=runner)
+                stream.show_results()
+                rows = stream.rows_fetched
+            else:
+                rows = 0
+            failed = runner.status != query_runner.COMPLETE
+        finally:
+            self._release_cursor(cursor, cache, final_query, failed)
+        self._report_stop(runner.status, rows, timeout, row_limit)
+        return runner.status
+
+    def run_command(self, is_insert: bool = False) -> bool:
         """Execute INSERT, UPDATE, DELETE, or other non-SELECT commands."""
         self.get_params_from_console()
         
         start_time = time.time()
         
         try:
-            # Replace parameters in query
-            final_query = self.replace_params_in_query(self.query, self.params)
+            # Pass parameters to the driver as bind parameters
+            final_query, args = self.bind_params(self.query, self.params)
             
-            cursor = self.connection.cursor()
-            cursor.execute(final_query)
+            cursor, cache = self._execute(final_query, args)
             
             if is_insert:
                 # For INSERT statements, get generated keys if available
@@ -91,10 +358,12 @@ class SQLCommand:
                     pass
             
             self.connection.commit()
-            cursor.close()
+            self._release_cursor(cursor, cache, final_query)
+            self._invalidate_cached_results(final_query)
             
             duration = time.time() - start_time
             print(f"Total Time: {duration:.3f} seconds")
+            return True
             
         except Exception as e:
             print(f"Error executing command: {e}")
@@ -102,8 +371,126 @@ class SQLCommand:
                 import traceback
                 traceback.print_exc()
             self.connection.rollback()
+            return False
+    
+    def run_export(self, filename: str) -> bool:
+        """Execute a SELECT query and stream the result into a Parquet, Arrow IPC or CSV file."""
+        from result_exporter import ResultExporter
+        
+        self.get_params_from_console()
+        
+        try:
+            final_query, args = self.bind_params(self.query, self.params)
+            batch_size = self.connection_manager.get_config_int('exportbatchsize', 10000) if self.connection_manager else 10000
+            compression = self.connection_manager.config.get('exportcompression') if self.connection_manager else None
+            
+            # Validate the file name before running the query
+            ResultExporter.detect_format(filename)
+            
+            cursor = self.connection.cursor()
+            try:
+                if args is None:
+                    cursor.execute(final_query)
+                else:
+                    cursor.execute(final_query, args)
+                ResultExporter(cursor, filename, batch_size, compression).export()
+            finally:
+                cursor.close()
+            return True
+            
+        except Exception as e:
+            print(f"Error exporting query: {e}")
+            if self.connection_manager and self.connection_manager.is_debug_enabled():
+                import traceback
+                traceback.print_exc()
+            return False
     
-    def run_batch(self):
+    def _execute_chunk(self, cursor, sql: str, rows: List[tuple], first_row: int) -> Tuple[int, List[Tuple[int, str]]]:
+        """Execute and commit one chunk with executemany, bisecting it when it fails.
+        
+        Returns the number of rows loaded and a (row number, error) entry for each rejected row,
+        so a single bad row doesn't roll back the rest of its chunk.
+        """
+        try:
+            cursor.executemany(sql, rows)
+            self.connection.commit()
+            return len(rows), []
+        except Exception as e:
+            try:
+                self.connection.rollback()
+            except Exception:
+                pass
+            if len(rows) == 1:
+                return 0, [(first_row, str(e))]
+        
+        middle = len(rows) // 2
+        loaded_left, failed_left = self._execute_chunk(cursor, sql, rows[:middle], first_row)
+        loaded_right, failed_right = self._execute_chunk(cursor, sql, rows[middle:], first_row + middle)
+        return loaded_left + loaded_right, failed_left + failed_right
+    
+    def run_bulk_batch(self, source: str, statement: str = None) -> bool:
+        """Load rows from a CSV/JSONL file or the console through a parameterized statement.
+        
+        Rows are submitted with executemany in chunks of batchsize (default 500) rows and
+        committed per chunk. Failing chunks are split in halves until the bad rows are found.
+        """
+        if statement is None:
+            statement = input("Statement: ")
+        
+        chunk_size = self.connection_manager.get_config_int('batchsize', 500) if self.connection_manager else 500
+        paramstyle = self.connection_manager.get_paramstyle() if self.connection_manager else 'qmark'
+        sql, names = to_driver_sql(statement, paramstyle)
+        if not names:
+            print("The statement has no :name parameters to bind the rows to.")
+            return False
+        
+        cursor = self.connection.cursor()
+        start_time = time.time()
+        total = 0
+        loaded = 0
+        failures = []
+        error = False
+        
+        try:
+            rows = read_batch_rows(source, names)
+            if paramstyle in ('named', 'pyformat'):
+                rows = (dict(zip(names, row)) for row in rows)
+            
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                chunk_loaded, chunk_failures = self._execute_chunk(cursor, sql, chunk, total + 1)
+                total += len(chunk)
+                loaded += chunk_loaded
+                failures.extend(chunk_failures)
+                
+                elapsed = time.time() - start_time
+                print(f"Rows: {total:8d} Loaded: {loaded:8d} Failed: {len(failures):6d} "
+                      f"Rate: {loaded / elapsed if elapsed > 0 else 0:.0f} rows/sec")
+            
+        except Exception as e:
+            print(f"Error in batch execution: {e}")
+            if self.connection_manager and self.connection_manager.is_debug_enabled():
+                import traceback
+                traceback.print_exc()
+            error = True
+        finally:
+            cursor.close()
+            if loaded:
+                self._invalidate_cached_results(statement)
+        
+        for row_number, message in failures[:20]:
+            print(f"Row {row_number} failed: {message}")
+        if len(failures) > 20:
+            print(f"... and {len(failures) - 20} more failed rows")
+        
+        duration = time.time() - start_time
+        print(f"Loaded {loaded} of {total} rows in {duration:.3f} seconds "
+              f"({loaded / duration if duration > 0 else 0:.0f} rows/sec), {len(failures)} failed")
+        return not error and not failures
+    
+    def run_batch(self) -> bool:
         """Execute batch commands."""
         print("Enter batch command, type [end] to finish and commit the batch.")
         
@@ -124,7 +511,10 @@ class SQLCommand:
                 cursor.execute(command)
             
             self.connection.commit()
+            for command in commands:
+                self._invalidate_cached_results(command)
             print(f"Executed {len(commands)} commands successfully")
+            return True
             
         except Exception as e:
             print(f"Error in batch execution: {e}")
@@ -132,5 +522,6 @@ class SQLCommand:
                 import traceback
                 traceback.print_exc()
             self.connection.rollback()
+            return False
         finally:
             cursor.close()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+StatementCache - LRU cache of prepared statements for one connection
+Re-executing the same SQL text on the same cursor lets the connector skip re-parsing and re-planning
+"""
+
+import re
+from collections import OrderedDict
+
+
+class StatementCache:
+    def __init__(self, connection, capacity: int = 20):
+        """Initialize the cache for a connection, keeping at most capacity open cursors."""
+        self.connection = connection
+        self.capacity = max(int(capacity), 1)
+        self._cursors = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(sql: str) -> str:
+        """Normalize SQL text so whitespace and a trailing semicolon don't change the key."""
+        return re.sub(r'\s+', ' ', sql).strip().rstrip(';').strip()
+
+    def cursor(self, sql: str):
+        """Get the cursor that last executed this SQL text, or a new one."""
+        key = self.normalize(sql)
+        cursor = self._cursors.get(key)
+        if cursor is not None:
+            self._cursors.move_to_end(key)
+            self.hits += 1
+            return cursor
+
+        self.misses += 1
+        cursor = self.connection.cursor()
+        self._cursors[key] = cursor
+        while len(self._cursors) > self.capacity:
+            _, oldest = self._cursors.popitem(last=False)
+            self._close_quietly(oldest)
+        return cursor
+
+    def discard(self, sql: str):
+        """Drop the cursor for this SQL text, e.g. after it failed or was cancelled."""
+        cursor = self._cursors.pop(self.normalize(sql), None)
+        if cursor is not None:
+            self._close_quietly(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close_quietly(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close all cached cursors."""
+        for cursor in self._cursors.values():
+            self._close_quietly(cursor)
+        self._cursors.clear()